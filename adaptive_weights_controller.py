@@ -0,0 +1,115 @@
+# load-adaptive scoring weights for every AP
+#
+# airtime / interference samples stream in per AP and channel and are kept as
+# exponentially weighted averages. An AP's load is the smoothed airtime on its
+# own channel, and its weights follow scoring.WEIGHT_PROFILES:
+#   mode="switch"       one profile per load level, with hysteresis so an AP
+#                       hovering at a threshold does not flap
+#   mode="interpolate"  piecewise linear between the profiles, read from a
+#                       precomputed lookup table over quantized load
+# tick() re-scores, in one batched scoring.score() call, only the APs that got
+# new samples or whose weights changed (python adaptive_weights_controller.py
+# for the tick latency at 10k APs)
+import numpy as np
+
+from scoring import WEIGHT_PROFILES, score
+
+# load levels from idle to busy, and the airtime each profile is meant for
+LEVELS = ("No Load", "Low Load", "Medium Load", "High Load")
+LEVEL_LOADS = np.array([0.0, 0.25, 0.5, 0.75])
+THRESHOLDS = (LEVEL_LOADS[:-1] + LEVEL_LOADS[1:]) / 2
+PROFILES = np.stack([WEIGHT_PROFILES[level] for level in LEVELS])
+
+LUT_SIZE = 1024
+
+
+def interpolated_lut(size=LUT_SIZE):
+    # (size, 4) weights for loads 0 .. 1
+    load = np.linspace(0, 1, size)
+    return np.stack([np.interp(load, LEVEL_LOADS, PROFILES[:, i]) for i in range(PROFILES.shape[1])], axis=1)
+
+
+def classify(load, previous=None, margin=0.05):
+    # load level index; with the previous levels, a level only changes once
+    # the load is `margin` past the threshold
+    load = np.asarray(load)
+    if previous is None:
+        return np.searchsorted(THRESHOLDS, load, side="right")
+    lowest = np.searchsorted(THRESHOLDS, load - margin, side="right")
+    highest = np.searchsorted(THRESHOLDS, load + margin, side="right")
+    return np.clip(previous, lowest, highest)
+
+
+class AdaptiveWeightsController:
+    def __init__(self, n_aps, bandwidth, dfs_prob, current, mode="interpolate", half_life=10.0, margin=0.05):
+        n_channels = len(bandwidth)
+        self.bandwidth = np.asarray(bandwidth, dtype=float)
+        self.dfs_prob = np.asarray(dfs_prob, dtype=float)
+        self.current = np.asarray(current)  # channel index of every AP
+        self.mode = mode
+        self.half_life = half_life
+        self.margin = margin
+        self.airtime = np.zeros((n_aps, n_channels))
+        self.interference = np.zeros((n_aps, n_channels))
+        self.levels = np.zeros(n_aps, dtype=int)
+        self.weights = np.tile(PROFILES[0], (n_aps, 1))
+        self.scores = np.zeros((n_aps, n_channels))
+        self.dirty = np.ones(n_aps, dtype=bool)
+        self.lut = interpolated_lut()
+
+    def observe(self, airtime, interference, aps=slice(None), dt=1.0):
+        # samples are (n_selected_aps, n_channels) fractions in [0, 1]
+        alpha = 1 - 0.5 ** (dt / self.half_life)
+        self.airtime[aps] += alpha * (airtime - self.airtime[aps])
+        self.interference[aps] += alpha * (interference - self.interference[aps])
+        self.dirty[aps] = True
+
+    def load(self):
+        return self.airtime[np.arange(len(self.current)), self.current]
+
+    def target_weights(self):
+        load = self.load()
+        if self.mode == "switch":
+            self.levels = classify(load, self.levels, self.margin)
+            return PROFILES[self.levels]
+        self.levels = classify(load)
+        return self.lut[np.clip(np.round(load * (LUT_SIZE - 1)).astype(int), 0, LUT_SIZE - 1)]
+
+    def tick(self):
+        # returns the APs that were re-scored
+        weights = self.target_weights()
+        affected = self.dirty | (np.abs(weights - self.weights).max(axis=1) > 1e-6)
+        rows = np.flatnonzero(affected)
+        self.weights[rows] = weights[rows]
+        self.scores[rows] = score(
+            self.interference[rows], self.airtime[rows], self.bandwidth, self.dfs_prob, self.weights[rows],
+        )
+        self.dirty[:] = False
+        return rows
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n_aps, n_channels = 10_000, 25
+    controller = AdaptiveWeightsController(
+        n_aps, rng.choice([0.25, 0.5, 0.75, 1.0], n_channels), rng.random(n_channels), rng.integers(0, n_channels, n_aps),
+    )
+    controller.observe(rng.random((n_aps, n_channels)), rng.random((n_aps, n_channels)))
+    controller.tick()
+
+    for mode in ("interpolate", "switch"):
+        controller.mode = mode
+        times = []
+        for _ in range(50):
+            # a tenth of the APs report every tick
+            aps = rng.choice(n_aps, n_aps // 10, replace=False)
+            samples = rng.random((2, len(aps), n_channels))
+            start = time.perf_counter()
+            controller.observe(*samples, aps=aps)
+            rescored = controller.tick()
+            times.append(time.perf_counter() - start)
+        print(f"{mode:11}: tick at {n_aps} APs p50 {np.median(times) * 1000:.2f} ms, "
+              f"max {max(times) * 1000:.2f} ms, {len(rescored)} APs re-scored")
+    print("APs per level:", dict(zip(LEVELS, np.bincount(controller.levels, minlength=len(LEVELS)))))
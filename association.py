@@ -0,0 +1,151 @@
+# STA -> AP association on a KD-tree
+#
+# AP positions live in one contiguous (n_aps, dim) array with a cKDTree over
+# it, so assigning every STA to its nearest AP is a single vectorized query
+# (python association.py: 100k STAs on 10k APs). Moving APs does not rebuild
+# the tree: moved APs are masked out of its answers and checked directly at
+# their new positions (the few STAs whose tree answers held a moved AP are
+# asked again for more neighbours), and the tree is only rebuilt once more
+# than rebuild_after APs have moved. reassociate() re-queries only the STAs
+# a move can change: those on a moved AP and those a moved AP got closer to.
+#
+# balance() is the second pass: STAs on APs holding more than `capacity`
+# stations are pushed to their next nearest AP, the ones that lose the least
+# distance going first
+import numpy as np
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist
+
+
+class Association:
+    def __init__(self, ap_positions, rebuild_after=32):
+        self.positions = np.array(ap_positions, dtype=float, order="C")
+        self.rebuild_after = rebuild_after
+        # APs moved since the last reassociate(), kept across rebuilds
+        self._pending = np.empty(0, dtype=int)
+        self.rebuild()
+
+    @property
+    def n_aps(self):
+        return len(self.positions)
+
+    def rebuild(self):
+        # the tree keeps its own copy, positions can then be edited in place
+        self._tree = cKDTree(self.positions, copy_data=True)
+        self._moved = np.empty(0, dtype=int)
+
+    def move_aps(self, indices, positions):
+        self.positions[indices] = positions
+        indices = np.atleast_1d(indices)
+        self._moved = np.union1d(self._moved, indices)
+        self._pending = np.union1d(self._pending, indices)
+        if len(self._moved) > self.rebuild_after:
+            self.rebuild()
+        return self
+
+    def _tree_query(self, points, k):
+        dist, idx = self._tree.query(points, k, workers=-1)
+        return dist.reshape(len(points), -1), idx.reshape(len(points), -1)
+
+    def _merge(self, points, dist, idx, k):
+        # tree answers on moved APs are stale, the moved APs are measured directly
+        dist = np.hstack([np.where(np.isin(idx, self._moved), np.inf, dist), cdist(points, self.positions[self._moved])])
+        idx = np.hstack([idx, np.broadcast_to(self._moved, (len(points), len(self._moved)))])
+        order = np.argsort(dist, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(dist, order, axis=1), np.take_along_axis(idx, order, axis=1)
+
+    def query(self, sta_positions, k=1):
+        # (n_sta, k) distances and AP indices, nearest first
+        points = np.atleast_2d(np.asarray(sta_positions, dtype=float))
+        k = min(k, self.n_aps)
+        dist, idx = self._tree_query(points, k)
+        if not len(self._moved):
+            return dist, idx
+        # STAs that lost a tree answer to a moved AP need deeper ones
+        short = np.isin(idx, self._moved).any(axis=1)
+        dist[~short], idx[~short] = self._merge(points[~short], dist[~short], idx[~short], k)
+        if short.any():
+            deep = self._tree_query(points[short], min(k + len(self._moved), self.n_aps))
+            dist[short], idx[short] = self._merge(points[short], *deep, k)
+        return dist, idx
+
+    def assign(self, sta_positions):
+        dist, idx = self.query(sta_positions)
+        return idx[:, 0]
+
+    def reassociate(self, sta_positions, previous):
+        # after move_aps: previous (the assignment from before the moves, an
+        # int array) is patched in place; returns it and which STAs changed AP
+        points = np.atleast_2d(np.asarray(sta_positions, dtype=float))
+        previous = np.asarray(previous)
+        changed = np.zeros(len(points), dtype=bool)
+        pending, self._pending = self._pending, np.empty(0, dtype=int)
+        if not len(pending):
+            return previous, changed
+        if len(pending) > self.rebuild_after:
+            affected = np.arange(len(points))
+        else:
+            # a STA keeps its AP unless that AP moved or a moved AP is now closer
+            current = np.linalg.norm(points - self.positions[previous], axis=1)
+            closer = (cdist(points, self.positions[pending]) < current[:, None]).any(axis=1)
+            affected = np.flatnonzero(np.isin(previous, pending) | closer)
+        new = self.assign(points[affected])
+        changed[affected] = new != previous[affected]
+        previous[affected] = new
+        return previous, changed
+
+    def balance(self, sta_positions, capacity=None, k=8):
+        dist, idx = self.query(sta_positions, k)
+        n, k = idx.shape
+        if capacity is None:
+            capacity = int(np.ceil(n / self.n_aps))
+        rows = np.arange(n)
+        choice = np.zeros(n, dtype=int)  # column of idx each STA is on
+        for _ in range(k - 1):
+            ap = idx[rows, choice]
+            load = np.bincount(ap, minlength=self.n_aps)
+            if not (load > capacity).any():
+                break
+            # distance lost by moving one choice further, STAs with no choice left stay
+            movable = choice < k - 1
+            nxt = np.minimum(choice + 1, k - 1)
+            regret = np.where(movable, dist[rows, nxt] - dist[rows, choice], np.inf)
+            # within every AP keep the `capacity` STAs that would lose the most
+            order = np.lexsort((-regret, ap))
+            sorted_ap = ap[order]
+            rank = np.arange(n) - np.searchsorted(sorted_ap, sorted_ap)
+            move = np.zeros(n, dtype=bool)
+            move[order] = rank >= capacity
+            choice[move & movable] += 1
+        return idx[rows, choice]
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    aps = rng.random((10_000, 2)) * 1000
+    stas = rng.random((100_000, 2)) * 1000
+
+    start = time.perf_counter()
+    assoc = Association(aps)
+    built = time.perf_counter()
+    assignment = assoc.assign(stas)
+    assigned = time.perf_counter()
+    moved = rng.choice(len(aps), 20, replace=False)
+    assoc.move_aps(moved, aps[moved] + rng.normal(0, 20, (20, 2)))
+    before = assignment.copy()
+    assignment, changed = assoc.reassociate(stas, assignment)
+    moved_at = time.perf_counter()
+    balanced = assoc.balance(stas)
+    done = time.perf_counter()
+    # what the incremental path saves: a new tree over the moved APs and a full assign
+    fresh = Association(assoc.positions).assign(stas)
+    rebuilt = time.perf_counter()
+
+    brute = np.argmin(cdist(stas[:1000], assoc.positions), axis=1)
+    assert (brute == assignment[:1000]).all() and (fresh == assignment).all()
+    assert (changed == (fresh != before)).all()
+    print(f"tree {1000 * (built - start):.1f} ms, assign {1000 * (assigned - built):.1f} ms, "
+          f"move 20 + reassociate {1000 * (moved_at - assigned):.1f} ms ({changed.sum()} changed) "
+          f"vs rebuild + assign {1000 * (rebuilt - done):.1f} ms, balance {1000 * (done - moved_at):.1f} ms")
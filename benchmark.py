@@ -0,0 +1,185 @@
+# render benchmark for every scene in the repo
+#
+#   python benchmark.py                          # run everything, write benchmarks/<commit>.json
+#   python benchmark.py --scenes FastLoop -q low # a subset
+#   python benchmark.py --save-baseline          # also store the run as benchmarks/baseline.json
+#   python benchmark.py --compare benchmarks/baseline.json --tolerance 0.15
+#
+# every scene is rendered in its own process with a fixed random seed, at
+# each requested quality, first into an empty media dir (cold: no Tex, Text
+# or prototype cache) and then again into the same dir (warm). manim's
+# partial movie cache is disabled so the warm run still renders every frame.
+# --compare exits with status 1 when any run got slower (or fatter) than the
+# baseline by more than the tolerance
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCHEMA_VERSION = 1
+
+SCENES = {
+    "FastLoop": "fastloop.py",
+    "DetailedFastLoop": "detailed.py",
+    "DetailedFastLoop_Reordered": "vector.py",
+    "FirstPassScene": "first_pass.py",
+    "SecondPassScene": "second_pass.py",
+    "Mesh3D": "mesh.py",
+    "TriangulationAnimation": "triangulation.py",
+    "HiddenNode": "hidden_node.py",
+    "ExposedNode": "exposed_node.py",
+}
+
+QUALITIES = {"low": "low_quality", "high": "high_quality"}
+
+# metrics compared against the baseline, and whether bigger is worse
+COMPARED = {"total_time": True, "fps": False, "peak_rss_mb": True}
+
+ROOT = Path(__file__).resolve().parent
+
+
+def run_worker(script, scene_name, quality, media_dir, seed):
+    # runs inside the child process, prints one json line
+    from manim import QUALITIES as MANIM_QUALITIES, config, tempconfig
+    from profiling import peak_rss_mb
+    from section_render import load_scene_class
+
+    q = MANIM_QUALITIES[quality]
+    overrides = {
+        "input_file": script,
+        "media_dir": media_dir,
+        "pixel_width": q["pixel_width"],
+        "pixel_height": q["pixel_height"],
+        "frame_rate": q["frame_rate"],
+        "disable_caching": True,
+        "verbosity": "WARNING",
+        "progress_bar": "none",
+    }
+    scene_cls = load_scene_class(script, scene_name)
+    with tempconfig(overrides):
+        start = time.perf_counter()
+        scene = scene_cls(random_seed=seed)
+        scene.render()
+        total_time = time.perf_counter() - start
+        frames = round(scene.renderer.time * config.frame_rate)
+    print(json.dumps({
+        "total_time": total_time,
+        "frames": frames,
+        "fps": frames / total_time,
+        "peak_rss_mb": peak_rss_mb(),
+    }))
+
+
+def run_scene(scene_name, quality, media_dir, seed):
+    command = [
+        sys.executable, str(Path(__file__).resolve()), "--worker",
+        str(ROOT / SCENES[scene_name]), scene_name, QUALITIES[quality], media_dir, str(seed),
+    ]
+    cp = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    if cp.returncode != 0:
+        return {"error": cp.stderr.strip().splitlines()[-1] if cp.stderr.strip() else f"exit {cp.returncode}"}
+    return json.loads(cp.stdout.strip().splitlines()[-1])
+
+
+def git_commit():
+    cp = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    return cp.stdout.strip() or "unknown"
+
+
+def run_benchmarks(scenes, qualities, seed):
+    results = {}
+    for scene_name in scenes:
+        for quality in qualities:
+            with tempfile.TemporaryDirectory(prefix="manim-bench-") as media_dir:
+                for cache in ("cold", "warm"):
+                    key = f"{scene_name}/{quality}/{cache}"
+                    results[key] = run_scene(scene_name, quality, media_dir, seed)
+                    print(f"{key:50} {format_result(results[key])}", flush=True)
+
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        manim_version = version("manim")
+    except PackageNotFoundError:
+        manim_version = None
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "manim": manim_version,
+        "machine": platform.platform(),
+        "seed": seed,
+        "results": results,
+    }
+
+
+def format_result(result):
+    if "error" in result:
+        return f"ERROR {result['error']}"
+    rss = result["peak_rss_mb"]
+    return (
+        f"{result['total_time']:8.2f}s {result['frames']:6d} frames {result['fps']:7.1f} fps"
+        + (f" {rss:8.1f} MB" if rss is not None else "")
+    )
+
+
+def compare(run, baseline, tolerance):
+    if baseline.get("schema_version") != SCHEMA_VERSION:
+        print(f"baseline has schema version {baseline.get('schema_version')}, expected {SCHEMA_VERSION}")
+        return False
+
+    ok = True
+    for key, result in run["results"].items():
+        base = baseline["results"].get(key)
+        if base is None or "error" in base:
+            continue
+        if "error" in result:
+            print(f"FAIL {key}: {result['error']}")
+            ok = False
+            continue
+        for metric, bigger_is_worse in COMPARED.items():
+            new, old = result.get(metric), base.get(metric)
+            if new is None or not old:
+                continue
+            change = (new - old) / old
+            worse = change > tolerance if bigger_is_worse else change < -tolerance
+            if worse:
+                print(f"FAIL {key}: {metric} {old:.2f} -> {new:.2f} ({change:+.1%})")
+                ok = False
+    return ok
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        script, scene_name, quality, media_dir, seed = sys.argv[2:]
+        run_worker(script, scene_name, quality, media_dir, int(seed))
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description="Benchmark scene render times")
+    parser.add_argument("--scenes", nargs="+", default=list(SCENES), choices=list(SCENES))
+    parser.add_argument("-q", "--qualities", nargs="+", default=list(QUALITIES), choices=list(QUALITIES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", type=Path, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative change, 0.15 = 15%%")
+    args = parser.parse_args()
+
+    run = run_benchmarks(args.scenes, args.qualities, args.seed)
+    output = args.output or ROOT / "benchmarks" / f"{run['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(run, indent=2))
+    print(f"results written to {output}")
+    if args.save_baseline:
+        baseline = ROOT / "benchmarks" / "baseline.json"
+        baseline.write_text(json.dumps(run, indent=2))
+        print(f"baseline saved to {baseline}")
+
+    if args.compare is not None:
+        if not compare(run, json.loads(args.compare.read_text()), args.tolerance):
+            sys.exit(1)
+        print(f"no regressions beyond {args.tolerance:.0%} against {args.compare}")
@@ -0,0 +1,164 @@
+# AP conflict graph and channel assignment
+#
+# two APs conflict when their ranges overlap. conflict_graph() finds the
+# pairs with a KD-tree (only pairs closer than twice the largest range are
+# ever looked at) and returns a symmetric scipy CSR adjacency matrix.
+#
+# channels are picked by cost: conflicts with neighbours first (CONFLICT_COST
+# each), then -preference (e.g. a scoring.score() row, higher is better), plus
+# dfs_penalty on DFS channels (CAC time) if asked for. dsatur() colors the
+# most constrained AP first, local_search() then moves conflicting APs to
+# cheaper channels, all APs at once with sparse matrix products, only moving
+# an AP when no neighbour wants to move more (so neighbours never swap onto
+# each other's channel). 50k APs take a couple of seconds (python
+# channel_assignment.py to check).
+#
+# reassign_after_radar() is the fast loop: the APs that heard radar leave its
+# channel (non-occupancy), and only they and their neighbours may move, with
+# a bonus for staying put (half a conflict) so unaffected neighbours move
+# only to clear a conflict
+import heapq
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.spatial import cKDTree
+
+DFS_CHANNELS = frozenset(range(52, 145, 4))
+
+CONFLICT_COST = 1000.0
+FORBIDDEN_COST = 1e9
+
+
+def conflict_graph(positions, ranges):
+    points = np.asarray(positions, dtype=float)
+    r = np.broadcast_to(np.asarray(ranges, dtype=float), len(points))
+    pairs = cKDTree(points).query_pairs(2 * r.max(), output_type="ndarray")
+    d = np.linalg.norm(points[pairs[:, 0]] - points[pairs[:, 1]], axis=1)
+    pairs = pairs[d < r[pairs[:, 0]] + r[pairs[:, 1]]]
+    rows = np.concatenate([pairs[:, 0], pairs[:, 1]])
+    cols = np.concatenate([pairs[:, 1], pairs[:, 0]])
+    return csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(points), len(points)))
+
+
+def channel_costs(channels, n_aps, preference=None, allowed=None, dfs_penalty=0.0):
+    # (n_aps, n_channels) cost of every channel before conflicts
+    channels = np.asarray(channels)
+    base = np.zeros((n_aps, len(channels)))
+    if preference is not None:
+        base -= np.broadcast_to(preference, base.shape)
+    base += dfs_penalty * np.isin(channels, list(DFS_CHANNELS))
+    if allowed is not None:
+        base = np.where(allowed, base, FORBIDDEN_COST)
+    return base
+
+
+def dsatur(graph, base_cost, assignment=None):
+    # channel index per AP; APs already assigned (>= 0) are kept as they are
+    n, k = base_cost.shape
+    indptr, indices = graph.indptr, graph.indices
+    assignment = np.full(n, -1) if assignment is None else np.array(assignment)
+    counts = np.zeros((n, k), dtype=int)  # neighbours on each channel
+    for v in np.flatnonzero(assignment >= 0):
+        counts[indices[indptr[v]:indptr[v + 1]], assignment[v]] += 1
+    saturation = (counts > 0).sum(axis=1)
+    degree = np.diff(indptr)
+    heap = [(-saturation[v], -degree[v], v) for v in np.flatnonzero(assignment < 0)]
+    heapq.heapify(heap)
+    while heap:
+        s, _, v = heapq.heappop(heap)
+        if assignment[v] >= 0 or -s != saturation[v]:
+            continue
+        c = np.argmin(counts[v] * CONFLICT_COST + base_cost[v])
+        assignment[v] = c
+        neighbours = indices[indptr[v]:indptr[v + 1]]
+        newly = neighbours[(counts[neighbours, c] == 0) & (assignment[neighbours] < 0)]
+        counts[neighbours, c] += 1
+        saturation[newly] += 1
+        for u in newly:
+            heapq.heappush(heap, (-saturation[u], -degree[u], u))
+    return assignment
+
+
+def local_search(graph, base_cost, assignment, movable=None, iterations=50, seed=0):
+    n, k = base_cost.shape
+    rng = np.random.default_rng(seed)
+    assignment = np.array(assignment)
+    rows = np.arange(n)
+    for _ in range(iterations):
+        onehot = csr_matrix((np.ones(n), (rows, assignment)), shape=(n, k))
+        cost = (graph @ onehot).toarray() * CONFLICT_COST + base_cost
+        best = cost.argmin(axis=1)
+        gain = cost[rows, assignment] - cost[rows, best]
+        wants = gain > 1e-9
+        if movable is not None:
+            wants &= movable
+        if not wants.any():
+            break
+        # random tie-break so equal neighbours do not block each other forever
+        priority = np.where(wants, gain + rng.random(n) * 1e-3, 0.0)
+        neighbour_max = graph.multiply(priority[None, :]).max(axis=1).toarray().ravel()
+        move = wants & (priority > neighbour_max)
+        assignment[move] = best[move]
+    return assignment
+
+
+def conflicts(graph, assignment):
+    # number of conflicting (same channel) links
+    graph = graph.tocoo()
+    return int((np.asarray(assignment)[graph.row] == np.asarray(assignment)[graph.col]).sum() // 2)
+
+
+def assign_channels(positions, ranges, channels, preference=None, dfs_penalty=0.0, iterations=50):
+    graph = conflict_graph(positions, ranges)
+    base = channel_costs(channels, graph.shape[0], preference, dfs_penalty=dfs_penalty)
+    assignment = local_search(graph, base, dsatur(graph, base), iterations=iterations)
+    return np.asarray(channels)[assignment]
+
+
+def reassign_after_radar(
+    graph, current, radar_channel, channels, affected, preference=None, dfs_penalty=0.0, stay_bonus=CONFLICT_COST / 2,
+):
+    # current: channel number per AP; channels: the fallback candidates (and
+    # preference their scores); returns the new channel number per AP
+    current = np.asarray(current)
+    n = len(current)
+    # every AP may also keep its present channel, even if it is not a candidate
+    universe = np.union1d(channels, current)
+    allowed = np.isin(universe, channels)[None, :] | (universe[None, :] == current[:, None])
+    affected = np.isin(np.arange(n), affected)
+    allowed[affected] &= universe != radar_channel
+    pref = np.zeros((n, len(universe)))
+    if preference is not None:
+        pref[:, np.searchsorted(universe, channels)] = np.broadcast_to(preference, (n, len(channels)))
+    assignment = np.searchsorted(universe, current)
+    pref[~affected, assignment[~affected]] += stay_bonus
+    base = channel_costs(universe, n, pref, allowed, dfs_penalty)
+    movable = affected | (graph @ affected.astype(float) > 0)
+    return universe[local_search(graph, base, assignment, movable)]
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n_aps = 50_000
+    positions = rng.random((n_aps, 2)) * 2000
+    channels = np.array([36, 40, 44, 48, 52, 56, 60, 64, 100, 104, 108, 112, 116, 120, 124, 128, 132, 136, 140, 149, 153, 157, 161, 165])
+
+    start = time.perf_counter()
+    graph = conflict_graph(positions, 10.0)
+    built = time.perf_counter()
+    base = channel_costs(channels, n_aps, rng.random(len(channels)) * 0.1)
+    colored = dsatur(graph, base)
+    colored_at = time.perf_counter()
+    assignment = local_search(graph, base, colored)
+    searched = time.perf_counter()
+    print(f"{n_aps} APs, {graph.nnz // 2} conflict links: graph {built - start:.2f} s, "
+          f"dsatur {colored_at - built:.2f} s ({conflicts(graph, colored)} conflicts), "
+          f"local search {searched - colored_at:.2f} s ({conflicts(graph, assignment)} conflicts)")
+
+    hit = channels[assignment] == 52
+    start = time.perf_counter()
+    moved = reassign_after_radar(graph, channels[assignment], 52, channels, np.flatnonzero(hit)[:50])
+    print(f"radar on 52: 50 APs reassigned in {time.perf_counter() - start:.2f} s, "
+          f"{(moved != channels[assignment]).sum()} APs changed channel")
@@ -0,0 +1,176 @@
+# STA <-> AP links as one mobject instead of one DashedLine per link
+#
+# a DashedLine is a VGroup with one sub-mobject per dash and every Create
+# walks all of them. ConnectionSet keeps the N links as start/end arrays and
+# lays out every dash of every link in one numpy pass, with the same dash
+# pattern as DashedLine (at least 2 dashes, dashes at both ends). Links are
+# styled per link, but drawn as one VMobject per distinct (color, opacity),
+# so thousands of links in a couple of colors are a couple of point buffers.
+#
+# each link also has a drawn fraction, `progress`, which DrawConnections
+# animates (Create/Uncreate for a subset of links); FadeConnections and
+# Retarget animate per-link opacity and endpoints the same way. Links whose
+# opacity changes every frame are isolated for the fade: each gets its own
+# VMobject whose stroke opacity is updated in place, so the shared buckets
+# are not rebuilt per frame, and they rejoin the buckets when it is over
+from manim import *
+
+# straight segment as a cubic bezier: anchor, two handles on the line, anchor
+_LINE_T = np.array([0.0, 1 / 3, 2 / 3, 1.0])[:, None]
+
+
+def dash_points(starts, ends, progress, dash_length=DEFAULT_DASH_LENGTH, dashed_ratio=0.5):
+    # (n_dashes, 4, 3) bezier points and the link of each dash
+    vec = ends - starts
+    n = np.maximum(2, np.ceil(np.linalg.norm(vec, axis=1) / dash_length * dashed_ratio)).astype(int)
+    link = np.repeat(np.arange(len(n)), n)
+    i = np.arange(len(link)) - np.repeat(np.cumsum(n) - n, n)
+    n = n[link]
+    dash = dashed_ratio / n
+    period = dash + (1 - dashed_ratio) / (n - 1)
+    # a link drawn up to `progress` shows only the dashes (or part of) before it
+    a = np.minimum(i * period, progress[link])
+    b = np.minimum(i * period + dash, progress[link])
+    keep = b > a
+    link, a, b = link[keep], a[keep, None], b[keep, None]
+    pa = starts[link] + a * vec[link]
+    pb = starts[link] + b * vec[link]
+    return pa[:, None] + (pb - pa)[:, None] * _LINE_T, link
+
+
+class ConnectionSet(VGroup):
+    def __init__(
+        self, starts, ends, color=YELLOW, opacity=1.0, progress=1.0,
+        dash_length=DEFAULT_DASH_LENGTH, dashed_ratio=0.5, stroke_width=DEFAULT_STROKE_WIDTH, **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.starts = np.array(starts, dtype=float).reshape(-1, 3)
+        self.ends = np.array(np.broadcast_to(ends, self.starts.shape), dtype=float)
+        n = len(self.starts)
+        self.colors = np.empty(n, dtype=object)
+        self.opacities = np.zeros(n)
+        self.isolated = np.zeros(n, dtype=bool)
+        self.progress = np.full(n, float(progress))
+        self.dash_length = dash_length
+        self.dashed_ratio = dashed_ratio
+        self.link_stroke_width = stroke_width
+        self.set_link_style(color=color, opacity=opacity)
+
+    @property
+    def n_links(self):
+        return len(self.starts)
+
+    def set_link_style(self, indices=slice(None), color=None, opacity=None):
+        # color is one color or one per selected link
+        if color is not None:
+            selected = np.arange(self.n_links)[indices]
+            colors = [color] * len(selected) if isinstance(color, (str, ManimColor)) else color
+            self.colors[selected] = [ManimColor(c).to_hex() for c in colors]
+        if opacity is not None:
+            self.opacities[indices] = opacity
+        return self.refresh()
+
+    def isolate(self, indices, isolated=True):
+        # links drawn by their own VMobject (True) or back in the style buckets
+        self.isolated[indices] = isolated
+        return self.refresh()
+
+    def set_endpoints(self, starts=None, ends=None, indices=slice(None)):
+        if starts is not None:
+            self.starts[indices] = starts
+        if ends is not None:
+            self.ends[indices] = ends
+        return self.refresh()
+
+    def refresh(self):
+        points, link = dash_points(self.starts, self.ends, self.progress, self.dash_length, self.dashed_ratio)
+        # (isolated link or -1, color, opacity or -1 for an isolated link)
+        own = np.where(self.isolated, np.arange(self.n_links), -1)
+        shared_opacity = np.where(self.isolated, -1.0, np.round(self.opacities, 3))
+        styles = list(zip(own.tolist(), self.colors, shared_opacity.tolist()))
+        keys = sorted(set(styles))
+        lookup = {key: k for k, key in enumerate(keys)}
+        style_of = np.fromiter((lookup[s] for s in styles), dtype=int, count=len(styles))
+        # one VMobject per style, reused while the set of styles stays the same
+        if [m.link_style for m in self.submobjects] != keys:
+            submobjects = []
+            for key in keys:
+                m = VMobject(stroke_color=key[1], stroke_opacity=max(key[2], 0), stroke_width=self.link_stroke_width)
+                m.link_style = key
+                submobjects.append(m)
+            self.submobjects = submobjects
+        for k, m in enumerate(self.submobjects):
+            m.set_points(points[style_of[link] == k].reshape(-1, 3))
+            if m.link_style[0] >= 0:
+                m.set_stroke(opacity=self.opacities[m.link_style[0]])
+        return self
+
+
+class _ConnectionAnimation(Animation):
+    # link i starts lag_ratio later than link i-1 within the animated subset
+    def __init__(self, connections, indices=None, lag_ratio=0.0, **kwargs):
+        self.indices = np.arange(connections.n_links) if indices is None else np.atleast_1d(indices)
+        self.link_lag = lag_ratio
+        super().__init__(connections, **kwargs)
+
+    def link_alpha(self, alpha):
+        n = len(self.indices)
+        span = 1 + max(n - 1, 0) * self.link_lag
+        return np.clip(self.rate_func(alpha) * span - np.arange(n) * self.link_lag, 0, 1)
+
+
+class DrawConnections(_ConnectionAnimation):
+    # Create (or Uncreate with reverse=True) for some links, each drawn from its start
+    def __init__(self, connections, indices=None, reverse=False, **kwargs):
+        self.reverse = reverse
+        kwargs.setdefault("introducer", not reverse)
+        super().__init__(connections, indices, **kwargs)
+
+    def interpolate_mobject(self, alpha):
+        t = self.link_alpha(alpha)
+        self.mobject.progress[self.indices] = 1 - t if self.reverse else t
+        self.mobject.refresh()
+
+
+class FadeConnections(_ConnectionAnimation):
+    # opacity of some links to `opacity`, e.g. 0 to fade them out of the set
+    def __init__(self, connections, indices=None, opacity=0.0, **kwargs):
+        self.target_opacity = opacity
+        super().__init__(connections, indices, **kwargs)
+
+    def begin(self):
+        self.start_opacity = self.mobject.opacities[self.indices].copy()
+        # the style buckets are picked once, the fading links change opacity on their own
+        self.was_isolated = self.mobject.isolated[self.indices].copy()
+        self.mobject.isolate(self.indices)
+        super().begin()
+
+    def interpolate_mobject(self, alpha):
+        t = self.link_alpha(alpha)
+        self.mobject.set_link_style(self.indices, opacity=self.start_opacity + t * (self.target_opacity - self.start_opacity))
+
+    def clean_up_from_scene(self, scene):
+        super().clean_up_from_scene(scene)
+        self.mobject.isolate(self.indices, self.was_isolated)
+
+
+class Retarget(_ConnectionAnimation):
+    # move the ends (and optionally starts) of some links, re-dashing as they stretch
+    def __init__(self, connections, ends, indices=None, starts=None, **kwargs):
+        super().__init__(connections, indices, **kwargs)
+        n = len(self.indices)
+        self.target_ends = np.array(np.broadcast_to(ends, (n, 3)), dtype=float)
+        self.target_starts = None if starts is None else np.array(np.broadcast_to(starts, (n, 3)), dtype=float)
+
+    def begin(self):
+        self.start_ends = self.mobject.ends[self.indices].copy()
+        self.start_starts = self.mobject.starts[self.indices].copy()
+        super().begin()
+
+    def interpolate_mobject(self, alpha):
+        t = self.link_alpha(alpha)[:, None]
+        ends = self.start_ends + t * (self.target_ends - self.start_ends)
+        starts = None
+        if self.target_starts is not None:
+            starts = self.start_starts + t * (self.target_starts - self.start_starts)
+        self.mobject.set_endpoints(starts, ends, self.indices)
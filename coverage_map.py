@@ -0,0 +1,209 @@
+# AP coverage as one raster instead of stacked translucent Circles
+#
+# CoverageGrid computes, for every pixel of a grid, the received power of the
+# best AP (log-distance path loss) and the total power on that AP's channel,
+# so RSSI and SINR (co-channel interference + noise) come straight out of
+# three flat arrays. The grid is walked in chunks of pixels x chunks of APs,
+# so the temporaries stay a few MB whatever the grid size or AP count.
+# set_ap() changes one AP's power or channel incrementally: co-channel totals
+# are patched with that AP's old/new contribution and only the pixels whose
+# best AP may change (its own cell, or where it now wins) are re-evaluated.
+#
+# CoverageMap shows a grid as a single ImageMobject: every pixel in the color
+# of its best AP, more opaque where the signal is stronger, transparent past
+# the AP's range edge, or colored by SINR with mode="sinr". Scaling every
+# range by the same factor only shifts all received powers by the same dB,
+# so set_range_scale() (a pulse, say) redraws from the computed grid without
+# touching it
+from manim import *
+
+
+class CoverageGrid:
+    def __init__(
+        self, positions, tx_power, channels, x_range, y_range, resolution=40,
+        path_loss_exponent=3.0, reference_loss=46.0, meters_per_unit=10.0, noise_dbm=-95.0,
+        chunk=16384, ap_chunk=128,
+    ):
+        self.positions = np.array(positions, dtype=float)[:, :2]
+        self.tx_power = np.zeros(len(self.positions))
+        self.channels = np.array(np.broadcast_to(channels, len(self.positions)))
+        self.path_loss_exponent = path_loss_exponent
+        self.reference_loss = reference_loss
+        self.meters_per_unit = meters_per_unit
+        self.noise_mw = 10 ** (noise_dbm / 10)
+        self.chunk = chunk
+        self.ap_chunk = ap_chunk
+        # pixel centres, row 0 at the top like an image
+        self.width = max(int(round((x_range[1] - x_range[0]) * resolution)), 1)
+        self.height = max(int(round((y_range[1] - y_range[0]) * resolution)), 1)
+        self.xs = np.linspace(x_range[0], x_range[1], self.width, endpoint=False) + 0.5 / resolution
+        self.ys = np.linspace(y_range[1], y_range[0], self.height, endpoint=False) - 0.5 / resolution
+        n = self.width * self.height
+        self.best_power = np.zeros(n)
+        self.best_ap = np.zeros(n, dtype=int)
+        self.serving_total = np.zeros(n)
+        # tx_power=None leaves the powers to be set (e.g. from ranges) before compute()
+        if tx_power is not None:
+            self.tx_power[:] = tx_power
+            self.compute()
+
+    def compute(self):
+        self.evaluate(np.arange(len(self.best_power)))
+        return self
+
+    def path_loss(self, distance):
+        d = np.maximum(np.asarray(distance) * self.meters_per_unit, 1.0)
+        return self.reference_loss + 10 * self.path_loss_exponent * np.log10(d)
+
+    def power_for_range(self, radius, edge_dbm=-70.0):
+        # tx power that puts the edge_dbm contour at `radius` scene units
+        return edge_dbm + self.path_loss(radius)
+
+    def pixel_points(self, idx):
+        return np.stack([self.xs[idx % self.width], self.ys[idx // self.width]], axis=1)
+
+    def received(self, points, aps, tx_power=None):
+        # (n_points, n_aps) received power in mW
+        tx = self.tx_power[aps] if tx_power is None else tx_power
+        d = np.linalg.norm(points[:, None, :] - self.positions[aps][None], axis=2)
+        return 10 ** ((tx - self.path_loss(d)) / 10)
+
+    def _chunks(self, idx):
+        for start in range(0, len(idx), self.chunk):
+            yield idx[start:start + self.chunk]
+
+    def evaluate(self, idx):
+        # full recompute of best AP and co-channel total for the given pixels
+        ap_chunks = [np.arange(s, min(s + self.ap_chunk, len(self.positions)))
+                     for s in range(0, len(self.positions), self.ap_chunk)]
+        for part in self._chunks(idx):
+            points = self.pixel_points(part)
+            best = np.zeros(len(part))
+            best_ap = np.zeros(len(part), dtype=int)
+            for aps in ap_chunks:
+                p = self.received(points, aps)
+                j = p.argmax(axis=1)
+                pj = p[np.arange(len(part)), j]
+                better = pj > best
+                best[better] = pj[better]
+                best_ap[better] = aps[j[better]]
+            serving = self.channels[best_ap]
+            total = np.zeros(len(part))
+            for aps in ap_chunks:
+                same = self.channels[aps][None, :] == serving[:, None]
+                total += (self.received(points, aps) * same).sum(axis=1)
+            self.best_power[part] = best
+            self.best_ap[part] = best_ap
+            self.serving_total[part] = total
+
+    def set_ap(self, i, tx_power=None, channel=None):
+        old_tx, old_ch = self.tx_power[i], self.channels[i]
+        if tx_power is not None:
+            self.tx_power[i] = tx_power
+        if channel is not None:
+            self.channels[i] = channel
+        new_tx, new_ch = self.tx_power[i], self.channels[i]
+
+        dirty = []
+        for part in self._chunks(np.arange(len(self.best_power))):
+            points = self.pixel_points(part)
+            old_p = self.received(points, [i], old_tx)[:, 0]
+            new_p = self.received(points, [i], new_tx)[:, 0]
+            # pixels served by another AP keep it unless AP i now beats it
+            serving = self.channels[self.best_ap[part]]
+            self.serving_total[part] += new_p * (serving == new_ch) - old_p * (serving == old_ch)
+            dirty.append(part[(self.best_ap[part] == i) | (new_p > self.best_power[part])])
+        self.evaluate(np.concatenate(dirty))
+        return self
+
+    def rssi_dbm(self):
+        return 10 * np.log10(self.best_power).reshape(self.height, self.width)
+
+    def sinr_db(self):
+        interference = np.maximum(self.serving_total - self.best_power, 0)
+        return 10 * np.log10(self.best_power / (interference + self.noise_mw)).reshape(self.height, self.width)
+
+
+class CoverageMap(ImageMobject):
+    def __init__(
+        self, positions, ranges, channels=36, colors=BLUE, x_range=None, y_range=None, resolution=40,
+        mode="rssi", edge_dbm=-70.0, fade_db=20.0, opacity=0.35, sinr_range=(0.0, 30.0), **kwargs,
+    ):
+        if x_range is None:
+            x_range = (-config.frame_width / 2, config.frame_width / 2)
+        if y_range is None:
+            y_range = (-config.frame_height / 2, config.frame_height / 2)
+        n = len(positions)
+        colors = [colors] * n if isinstance(colors, (str, ManimColor)) else colors
+        self.ap_rgb = np.array([ManimColor(c).to_int_rgb() for c in colors], dtype=np.uint8)
+        self.mode = mode
+        self.edge_dbm = edge_dbm
+        self.fade_db = fade_db
+        self.peak_opacity = opacity
+        self.sinr_range = sinr_range
+        self.offset_db = 0.0  # display only shift of every AP's power, see set_range_scale
+        self.grid = CoverageGrid(positions, None, channels, x_range, y_range, resolution)
+        self.grid.tx_power[:] = self.grid.power_for_range(np.broadcast_to(ranges, n), edge_dbm)
+        self.grid.compute()
+        super().__init__(self.rgba(), **kwargs)
+        self.stretch_to_fit_width(x_range[1] - x_range[0])
+        self.stretch_to_fit_height(y_range[1] - y_range[0])
+        self.move_to([(x_range[0] + x_range[1]) / 2, (y_range[0] + y_range[1]) / 2, 0])
+
+    def rgba(self):
+        g = self.grid
+        rssi = g.rssi_dbm() + self.offset_db
+        inside = rssi >= self.edge_dbm
+        rgba = np.zeros((g.height, g.width, 4), dtype=np.uint8)
+        if self.mode == "sinr":
+            lo, hi = self.sinr_range
+            t = np.clip((g.sinr_db() + self.offset_db - lo) / (hi - lo), 0, 1)[..., None]
+            # red (bad) -> yellow -> green (good)
+            rgba[..., :3] = np.where(
+                t < 0.5,
+                RED.to_int_rgb() + 2 * t * (YELLOW.to_int_rgb() - RED.to_int_rgb()),
+                YELLOW.to_int_rgb() + (2 * t - 1) * (GREEN.to_int_rgb() - YELLOW.to_int_rgb()),
+            )
+            alpha = np.where(inside, self.peak_opacity, 0)
+        else:
+            rgba[..., :3] = self.ap_rgb[g.best_ap].reshape(g.height, g.width, 3)
+            strength = np.clip((rssi - self.edge_dbm) / self.fade_db, 0, 1)
+            alpha = np.where(inside, self.peak_opacity * (0.25 + 0.75 * strength), 0)
+        rgba[..., 3] = np.round(255 * alpha)
+        return rgba
+
+    def refresh(self):
+        # keep whatever opacity set_opacity/FadeIn put on top of the per-pixel alpha
+        rgba = self.rgba()
+        self.pixel_array[..., :3] = rgba[..., :3]
+        self.orig_alpha_pixel_array = rgba[..., 3].copy()
+        return self.set_opacity(self.stroke_opacity)
+
+    def set_range_scale(self, scale, opacity=None):
+        # every range times scale (and the peak opacity), drawn from the grid as computed
+        self.offset_db = 10 * self.grid.path_loss_exponent * np.log10(scale)
+        if opacity is not None:
+            self.peak_opacity = opacity
+        return self.refresh()
+
+    def set_ranges(self, indices, radius):
+        self.offset_db = 0.0
+        indices = np.atleast_1d(indices)
+        for i, r in zip(indices, np.broadcast_to(radius, indices.shape)):
+            self.grid.set_ap(i, tx_power=self.grid.power_for_range(r, self.edge_dbm))
+        return self.refresh()
+
+    def set_ap(self, i, channel=None, color=None):
+        if color is not None:
+            self.ap_rgb[i] = ManimColor(color).to_int_rgb()
+        if channel is not None:
+            self.grid.set_ap(i, channel=channel)
+        return self.refresh()
+
+
+def coverage_map(ap_config, range_radius=3.5, **kwargs):
+    # same ap_config entries as topology.ap_topology
+    return CoverageMap(
+        [conf["pos"] for conf in ap_config], range_radius,
+        [conf["ch"] for conf in ap_config], [conf["color"] for conf in ap_config], **kwargs,
+    )
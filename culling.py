@@ -0,0 +1,144 @@
+# frustum / level-of-detail culling and a cached depth order for 3D scenes
+#
+# ThreeDCamera depth sorts (and shades) every family member of every mobject
+# on every frame, on screen or not. CullingCamera builds the display list
+# once per camera pose instead:
+#   - every mobject's bounding box is cached against a cheap fingerprint of
+#     its points (count, first and last point), so only mobjects that changed
+#     are measured again
+#   - the boxes are projected all at once; mobjects entirely off screen or
+#     behind the camera are skipped
+#   - labels (MathTex, Tex, Text) projected smaller than min_label_px are
+#     hidden, or drawn as one filled box in their color with label_mode="box"
+#   - the kept mobjects are depth sorted like ThreeDCamera does
+# and the whole list is reused as long as the camera pose and the
+# fingerprints stay the same, so a still camera over a big static topology
+# costs a lookup per frame and the drawing is proportional to what is seen.
+# Mobjects fixed in frame or with a fixed orientation are never culled.
+#
+# scenes opt in with the Culled mixin: class Mesh3D(Culled, ThreeDScene)
+from manim import *
+from manim.camera.camera import Camera
+from manim.utils.family import extract_mobject_family_members
+
+LABEL_TYPES = (SingleStringMathTex, MathTex, Tex, Text, MarkupText)
+
+
+def _fingerprint(mob):
+    points = mob.points
+    return len(points), points[0].tobytes(), points[-1].tobytes()
+
+
+class CullingCamera(ThreeDCamera):
+    min_label_px = 4.0
+    label_mode = "hide"  # or "box"
+    margin = 0.1  # scene units around the frame that still count as on screen
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._boxes = {}  # id(mob) -> (fingerprint, (2, 3) bounding box)
+        self._proxies = {}  # id(label) -> (box bytes, proxy VMobject)
+        self._cache_key = None
+        self._cache = None
+        self.culled = 0
+
+    def pose(self):
+        return (
+            self.get_rotation_matrix().tobytes(), np.asarray(self.frame_center, dtype=float).tobytes(),
+            self.get_focal_distance(), self.get_zoom(), self.pixel_width, self.pixel_height,
+        )
+
+    def bounding_box(self, mob, key):
+        cached = self._boxes.get(id(mob))
+        if cached is None or cached[0] != key:
+            cached = key, np.array([mob.points.min(axis=0), mob.points.max(axis=0)])
+            self._boxes[id(mob)] = cached
+        return cached[1]
+
+    def label_proxy(self, label, box):
+        # one filled rectangle over the label's box, in the label's color
+        cached = self._proxies.get(id(label))
+        if cached is None or cached[0] != box.tobytes():
+            (x0, y0, z0), (x1, y1, z1) = box
+            z = (z0 + z1) / 2
+            proxy = VMobject(fill_color=label.get_fill_color(), fill_opacity=0.6, stroke_width=0)
+            proxy.set_points_as_corners([[x0, y0, z], [x1, y0, z], [x1, y1, z], [x0, y1, z], [x0, y0, z]])
+            cached = box.tobytes(), proxy
+            self._proxies[id(label)] = cached
+        return cached[1]
+
+    def get_mobjects_to_display(self, mobjects, include_submobjects=True, excluded_mobjects=None):
+        mobjects = list(mobjects)
+        family = Camera.get_mobjects_to_display(self, mobjects, include_submobjects, excluded_mobjects)
+        keys = [_fingerprint(mob) for mob in family]
+        cache_key = (self.pose(), tuple(map(id, family)), tuple(keys))
+        if cache_key == self._cache_key:
+            return self._cache
+        if len(self._boxes) > 2 * len(family) + 1024:
+            # forget mobjects that left the scene
+            alive = set(map(id, family))
+            self._boxes = {k: v for k, v in self._boxes.items() if k in alive}
+            self._proxies = {}
+        fixed = self.fixed_in_frame_mobjects | set(self.fixed_orientation_mobjects)
+        # the label each family member belongs to, if any
+        label_of = {}
+        for label in extract_mobject_family_members(mobjects):
+            if isinstance(label, LABEL_TYPES):
+                for part in label.get_family():
+                    label_of.setdefault(id(part), label)
+
+        boxes = np.array([self.bounding_box(mob, key) for mob, key in zip(family, keys)]).reshape(-1, 2, 3)
+        corners = boxes[:, [[0, 0, 0], [0, 0, 1], [0, 1, 0], [0, 1, 1], [1, 0, 0], [1, 0, 1], [1, 1, 0], [1, 1, 1]], [0, 1, 2]]
+        flat = corners.reshape(-1, 3)
+        depth = ((flat - self.frame_center) @ self.get_rotation_matrix().T)[:, 2].reshape(-1, 8)
+        projected = self.project_points(flat)[:, :2].reshape(-1, 8, 2)
+        lo, hi = projected.min(axis=1), projected.max(axis=1)
+        half = np.array([self.frame_width, self.frame_height]) / 2 + self.margin
+        on_screen = np.all((hi >= -half) & (lo <= half), axis=1) & (depth.min(axis=1) < self.get_focal_distance())
+
+        # a label is as big as all of its parts together
+        label_box = {}
+        for i, mob in enumerate(family):
+            label = label_of.get(id(mob))
+            if label is not None:
+                box = label_box.setdefault(id(label), [boxes[i].copy(), lo[i, 1], hi[i, 1]])
+                box[0] = np.array([np.minimum(box[0][0], boxes[i][0]), np.maximum(box[0][1], boxes[i][1])])
+                box[1], box[2] = min(box[1], lo[i, 1]), max(box[2], hi[i, 1])
+        to_px = self.pixel_height / self.frame_height
+
+        shown = []
+        proxied = set()
+        for i, mob in enumerate(family):
+            if mob in fixed:
+                shown.append(mob)
+                continue
+            if not on_screen[i]:
+                continue
+            label = label_of.get(id(mob))
+            if label is not None:
+                box, low, high = label_box[id(label)]
+                if (high - low) * to_px < self.min_label_px:
+                    if self.label_mode == "box" and id(label) not in proxied:
+                        proxied.add(id(label))
+                        shown.append(self.label_proxy(label, box))
+                    continue
+            shown.append(mob)
+        self.culled = len(family) - len(shown)
+
+        rot = self.get_rotation_matrix()
+
+        def z_key(mob):
+            if not (hasattr(mob, "shade_in_3d") and mob.shade_in_3d):
+                return np.inf
+            return np.dot(mob.get_z_index_reference_point(), rot.T)[2]
+
+        self._cache_key = cache_key
+        self._cache = sorted(shown, key=z_key)
+        return self._cache
+
+
+class Culled:
+    # mixin, put it before ThreeDScene: class Mesh3D(Profiled, BatchedTex, Culled, ThreeDScene)
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("camera_class", CullingCamera)
+        super().__init__(*args, **kwargs)
@@ -1,9 +1,26 @@
 from manim import *
 import numpy as np
 import math
+import os
 import random
+import tempfile
 
-class DetailedFastLoop(Scene):
+from channel_assignment import conflict_graph, reassign_after_radar
+from connections import ConnectionSet, DrawConnections
+from coverage_map import coverage_map
+from frame_parallel import FrameParallel
+from histogram import BarHistogram, GrowBars
+from layer_cache import LayerCached
+from plotting import plot_with_area
+from profiling import Profiled
+from radar_estimator import RadarEstimator
+from radar_signal import detect, synthesize
+from scoring import WEIGHT_PROFILES, ranking_rows
+from switch_sim import SwitchSimulator, percentiles
+from tex_batch import BatchedTex
+from topology import ap_dot, ap_topology, channel_label, station
+
+class DetailedFastLoop(Profiled, BatchedTex, LayerCached, FrameParallel, Scene):
     def construct(self):
         # --- CONFIGURATION ---
         self.camera.background_color = "#111111"
@@ -22,48 +39,30 @@ class DetailedFastLoop(Scene):
             {"pos": [0, 2, 0], "ch": 52, "color": BLUE}, # The Victim AP
         ]
         
-        aps = VGroup()
-        ranges = VGroup()
-        labels = VGroup()
-        
-        for conf in ap_config:
-            ap = Dot(conf["pos"], color=conf["color"], radius=0.15)
-            # Add an "Antenna" feel
-            antenna = Line(conf["pos"], [conf["pos"][0], conf["pos"][1]+0.3, 0], color=GRAY)
-            ap_group = VGroup(antenna, ap)
-            
-            # Wifi Range
-            wifi_range = Circle(radius=3.5, color=conf["color"], fill_opacity=0.1).move_to(conf["pos"])
-            
-            # Label
-            lbl = MathTex(f"CH = {conf['ch']}", font_size=28, color=conf["color"]).next_to(ap, DOWN)
-            
-            aps.add(ap_group)
-            ranges.add(wifi_range)
-            labels.add(lbl)
+        # Antenna + dot per AP and channel label, 3.5 wifi range as one coverage raster
+        aps, _, labels = ap_topology(ap_config, with_ranges=False)
+        ranges = coverage_map(ap_config)
 
         # Clients (STAs)
         stas = VGroup()
-        connections = VGroup()
         for _ in range(5):
             # Random position near the center AP (the one that will switch)
             offset = np.random.normal(0, 1.0, 2)
             pos = ap_config[2]["pos"] + np.append(offset, 0)
-            sta = Square(side_length=0.15, color=GREEN, fill_opacity=1).move_to(pos)
+            sta = station(pos, side_length=0.15)
             stas.add(sta)
-            # Line to AP
-            line = DashedLine(sta.get_center(), ap_config[2]["pos"], color=GREEN, stroke_opacity=0.5)
-            connections.add(line)
+        # Lines to AP
+        connections = ConnectionSet([sta.get_center() for sta in stas], ap_config[2]["pos"], color=GREEN, opacity=0.5)
 
         self.play(
             LaggedStart(
-                *[Create(r) for r in ranges],
+                FadeIn(ranges),
                 *[FadeIn(a) for a in aps],
                 *[Write(l) for l in labels],
                 lag_ratio=0.2
             )
         )
-        self.play(FadeIn(stas), Create(connections))
+        self.play(FadeIn(stas), DrawConnections(connections))
         self.wait(1)
 
         # --- SCENE 2: RADAR EVENT ---
@@ -76,7 +75,16 @@ class DetailedFastLoop(Scene):
         radar_origin = [1, 2.5, 0]
         radar_dot = Dot(radar_origin, color=RED)
         radar_text = Text("RADAR PULSE DETECTED", font_size=42, color=RED, weight=BOLD).move_to([0,0,0])
-        radar_sub = Text("Microsecond burst on Channel 52", font_size=24, color=RED_A).next_to(radar_text, DOWN)
+        # Synthetic capture on channel 52 (noise, Wi-Fi, a radar burst) through the pulse detector
+        with tempfile.TemporaryDirectory() as tmp:
+            capture = os.path.join(tmp, "ch52.npy")
+            synthesize(capture, 20_000, radar=[(2_000, 2)], seed=3)
+            radar_hits = detect(capture)
+        radar_sub = Text(
+            f"{radar_hits['n_pulses'][0]} x {radar_hits['width_us'][0]:.0f} µs pulses, "
+            f"PRI {radar_hits['pri_us'][0]:.0f} µs on Channel 52",
+            font_size=24, color=RED_A
+        ).next_to(radar_text, DOWN)
         
         # Pulse animation
         pulses = VGroup()
@@ -112,7 +120,7 @@ class DetailedFastLoop(Scene):
             FadeOut(alert_box), FadeOut(radar_text), FadeOut(radar_sub),
             FadeOut(radar_dot), FadeOut(pulses),
             FadeOut(stas), FadeOut(connections),
-            ranges.animate.set_opacity(0.05), # Dim the map
+            ranges.animate.set_opacity(0.5), # Dim the map
             aps.animate.set_opacity(0.2),
             labels.animate.set_opacity(0.2)
         )
@@ -136,12 +144,15 @@ class DetailedFastLoop(Scene):
         x_lbl = axes.get_x_axis_label("Channel", edge=DOWN, direction=DOWN).scale(0.6)
         y_lbl = axes.get_y_axis_label("P(Radar)", edge=LEFT, direction=LEFT).scale(0.6)
         
-        # Generate Gaussian Curve
-        def pdf(x):
-            return 1.0 / (sigma * math.sqrt(2 * math.pi)) * math.exp(-0.5 * ((x - mu) / sigma) ** 2)
-        
-        curve = axes.plot(pdf, color=BLUE_C)
-        area = axes.get_area(curve, x_range=[46, 58], color=BLUE, opacity=0.3)
+        # Historic radar events, streamed into the estimator
+        estimator = RadarEstimator(46, 58, bins=24)
+        for _ in range(50):
+            estimator.update(np.random.normal(mu, sigma, 100))
+        # plus what the detector just found
+        estimator.update(np.full(len(radar_hits['time_us']), 52))
+
+        # Gaussian fitted from the estimator state
+        curve, area = plot_with_area(axes, estimator.pdf, area_range=[46, 58], area_color=BLUE, color=BLUE_C)
         
         hist_group = VGroup(axes, x_lbl, y_lbl, curve, area)
         
@@ -199,16 +210,23 @@ class DetailedFastLoop(Scene):
         step_select = Text("Step 3: Best Candidate Selection", font_size=32, color=GREEN).to_edge(UP)
         self.play(Transform(title, step_select))
 
-        # Final Scores Table
-        # Note: Assuming Higher Score = Better Candidate based on your example table where Ch 60 was 0.40
-        final_data = [
-            ["CH", "Intf", "DFS P", "Airtime", "Score"],
-            ["48", "High", "0.8", "5%", "0.12"],
-            ["52", "High", "1.0", "10%", "0.22"], # Current
-            ["56", "Low", "0.8", "5%", "0.25"],
-            ["60", "V. Low", "0.5", "5%", "0.40"], # Winner
-            ["100", "Low", "0.0", "15%", "0.38"],
-        ]
+        # Final Scores Table, computed with the high load weights (higher score = better candidate)
+        channels = [48, 52, 56, 60, 100]
+        current_ch = 52 # Radar was just detected here
+        final_data, scores = ranking_rows(
+            channels,
+            interference=np.array([0.65, 0.65, 0.20, 0.08, 0.20]),
+            airtime=np.array([0.05, 0.10, 0.05, 0.05, 0.15]),
+            bandwidth=np.array([0.25, 0.25, 0.25, 0.75, 0.50]),
+            dfs_prob=np.array([0.8, 1.0, 0.8, 0.5, 0.0]),
+            weights=WEIGHT_PROFILES["High Load"],
+        )
+        # The victim leaves the radar channel; scores rank the candidates, overlapping APs rule channels out
+        new_channels = reassign_after_radar(
+            conflict_graph([conf["pos"] for conf in ap_config], 3.5),
+            [conf["ch"] for conf in ap_config], current_ch, channels, affected=[2], preference=scores,
+        )
+        best_ch = int(new_channels[2])
 
         final_table = Table(
             final_data,
@@ -222,7 +240,7 @@ class DetailedFastLoop(Scene):
         self.wait(1)
 
         # Highlight Current (Bad)
-        bad_row = final_table.get_rows()[2]
+        bad_row = final_table.get_rows()[channels.index(current_ch) + 1]
         bad_rect = SurroundingRectangle(bad_row, color=RED)
         bad_lbl = Text("Current (Radar)", font_size=20, color=RED).next_to(bad_rect, LEFT)
         
@@ -230,7 +248,7 @@ class DetailedFastLoop(Scene):
         self.wait(0.5)
 
         # Highlight Winner (Good)
-        good_row = final_table.get_rows()[4]
+        good_row = final_table.get_rows()[channels.index(best_ch) + 1]
         good_rect = SurroundingRectangle(good_row, color=GREEN)
         good_lbl = Text("Best Fallback", font_size=20, color=GREEN).next_to(good_rect, LEFT)
         
@@ -244,7 +262,7 @@ class DetailedFastLoop(Scene):
 
         # Bring map back to life
         self.play(
-            ranges.animate.set_opacity(0.1),
+            ranges.animate.set_opacity(1),
             aps.animate.set_opacity(1),
             labels.animate.set_opacity(1)
         )
@@ -252,14 +270,15 @@ class DetailedFastLoop(Scene):
         # Change Channel Label
         # Victim AP is index 2, label index 2
         old_label = labels[2]
-        new_label = MathTex("CH = 60", font_size=32, color=GREEN).next_to(aps[2], DOWN)
+        new_label = channel_label(best_ch, GREEN).next_to(aps[2], DOWN)
         
         # Color change to indicate switch
         switch_indicator = Circle(radius=0.5, color=GREEN).move_to(aps[2])
         
         self.play(
             Transform(old_label, new_label),
-            Transform(aps[2][1], Dot(ap_config[2]["pos"], color=GREEN, radius=0.15)), # Change AP dot color
+            Transform(aps[2][1], ap_dot(ap_config[2]["pos"], GREEN, 0.15)), # Change AP dot color
+            ranges.animate.set_ap(2, channel=best_ch, color=GREEN), # Only the victim's cell is recomputed
             Broadcast(switch_indicator, focal_point=aps[2].get_center())
         )
         
@@ -267,14 +286,22 @@ class DetailedFastLoop(Scene):
         self.play(FadeIn(stas))
         
         # Animate connection lines redrawing
-        new_connections = VGroup()
-        for sta in stas:
-            line = DashedLine(sta.get_center(), ap_config[2]["pos"], color=GREEN, stroke_opacity=0.8)
-            new_connections.add(line)
+        new_connections = ConnectionSet([sta.get_center() for sta in stas], ap_config[2]["pos"], color=GREEN, opacity=0.8, progress=0)
             
-        self.play(Create(new_connections))
-        
-        success_text = Text("Switch Complete: Latency < 200ms", font_size=24, color=GREEN).next_to(aps[2], UP)
-        self.play(Write(success_text))
+        self.play(DrawConnections(new_connections))
+        
+        # Simulated switch latency for this AP's STAs and candidate list, instead of a claim
+        latencies, _ = SwitchSimulator(n_stas=len(stas), n_candidates=len(channels)).run(2000)
+        p = percentiles(latencies)
+        success_text = Text(
+            f"Switch Complete: p50 {p[50]:.0f} ms, p99 {p[99]:.0f} ms", font_size=24, color=GREEN
+        ).next_to(aps[2], UP)
+        counts, edges = np.histogram(latencies, bins=30, range=(0, 600))
+        latency_axes = Axes(x_range=[0, 600, 100], y_range=[0, 1, 0.5], x_length=3.5, y_length=1.5, tips=False).to_corner(DR)
+        latency_hist = BarHistogram(latency_axes, counts / counts.max(), edges, fill_color=GREEN)
+        markers = VGroup(*[latency_axes.get_vertical_line(latency_axes.c2p(p[q], 1), color=YELLOW) for q in (50, 99)])
+        latency_label = Text("switch latency, 0-600 ms", font_size=18).next_to(latency_axes, DOWN)
+        self.play(Write(success_text), Create(latency_axes), Write(latency_label))
+        self.play(GrowBars(latency_hist), Create(markers))
         
         self.wait(2)
\ No newline at end of file
@@ -1,21 +1,62 @@
 from manim import *
 
-class ExposedNode(Scene):
+from connections import ConnectionSet, DrawConnections
+from coverage_map import CoverageMap
+from csma import links, sweep
+from layer_cache import LayerCached
+from node_problems import find_exposed
+from profiling import Profiled
+from topology import ap_dot, station, text_label
+
+class ExposedNode(Profiled, LayerCached, Scene):
     def construct(self):
 
-        main_ap = Dot(ORIGIN + UP, color=BLUE)
-        main_label = Text("Associated AP", font_size=24).next_to(main_ap, UP)
+        main_ap = ap_dot(ORIGIN + UP)
+        main_label = text_label("Associated AP").next_to(main_ap, UP)
+
+        sta = station(ORIGIN + LEFT)
+        sta_label = text_label('STA').next_to(sta, DOWN)
+
+        exposed_ap = ap_dot(ORIGIN + RIGHT, RED)
+        exposed_label = text_label('Exposed Node AP').next_to(exposed_ap, DOWN).shift(RIGHT * 0.5)
 
-        sta = Dot(ORIGIN + LEFT, color=GREEN)
-        sta_label = Text('STA', font_size=24).next_to(sta, DOWN)
+        self.add(main_ap, main_label, sta, sta_label, exposed_ap, exposed_label)
 
-        hidden_ap = Dot(ORIGIN + RIGHT, color=RED)
-        hidden_label = Text('Exposed Node AP', font_size=24).next_to(hidden_ap, DOWN).shift(RIGHT * 0.5)
+        # APs reach (and hear) as far as their range pulses; the coverage is
+        # computed once at full reach and the pulse (range 1 -> reach -> 1,
+        # opacity 0.1 -> 0.2 -> 0.1) only rescales it
+        reach = 1.6
+        ap_positions = np.array([main_ap.get_center(), exposed_ap.get_center()])
+        sta_positions = np.array([sta.get_center()])
+        sta_ap = [0]
+        ranges = CoverageMap(ap_positions, reach, colors=[BLUE, RED]).set_range_scale(1 / reach, opacity=0.1)
+        self.add(ranges)
+        self.play(UpdateFromAlphaFunc(ranges, lambda m, a: m.set_range_scale((1 + (reach - 1) * a) / reach, 0.1 + 0.1 * a)), run_time=1)
+        self.play(UpdateFromAlphaFunc(ranges, lambda m, a: m.set_range_scale((reach - (reach - 1) * a) / reach, 0.2 - 0.1 * a)), run_time=1)
 
-        self.add(main_ap, main_label, sta, sta_label, hidden_ap, hidden_label)
+        # every (AP, STA, exposed AP) triple: the AP hears the exposed AP and defers, yet it never reaches the STA
+        triples = find_exposed(ap_positions, sta_positions, sta_ap, reach)
+        heard = ConnectionSet(ap_positions[triples[:, 2]], ap_positions[triples[:, 0]], color=ORANGE, progress=0)
+        served = ConnectionSet(ap_positions[triples[:, 0]], sta_positions[triples[:, 1]], color=YELLOW, progress=0)
+        count = text_label(f"exposed-node triples: {len(triples)}", color=ORANGE).to_edge(UP)
+        self.play(DrawConnections(heard), DrawConnections(served), Write(count), run_time=1)
 
-        ap_range = Circle(radius=1, color=BLUE, fill_opacity=0.1).move_to(main_ap.get_center())
-        hidden_range = Circle(radius=1, color=RED, fill_opacity=0.1).move_to(hidden_ap.get_center())
-        self.add(ap_range, hidden_range)
-        self.play(ap_range.animate.scale(1.6).set_fill(opacity=0.2), hidden_range.animate.scale(1.6).set_fill(opacity=0.2), run_time=1)
-        self.play(ap_range.animate.scale(10/16).set_fill(opacity=0.1), hidden_range.animate.scale(10/16).set_fill(opacity=0.1), run_time=1)
\ No newline at end of file
+        # measured cost for the STA's link: CSMA/CA rounds at increasing offered load
+        # the exposed AP sends to its own STA on its far side: the two APs sense
+        # each other, but neither reaches the other's receiver
+        away = normalize(exposed_ap.get_center() - main_ap.get_center())
+        exposed_sta = station(exposed_ap.get_center() + away * 0.75 * reach)
+        exposed_sta_label = text_label("its STA", 18).next_to(exposed_sta, RIGHT)
+        self.play(FadeIn(exposed_sta), Write(exposed_sta_label))
+        senses, reaches = links(ap_positions, reach, rx_pos=[sta.get_center(), exposed_sta.get_center()])
+        loads = np.linspace(0.05, 1, 20)
+        curves = sweep(senses, reaches, loads, trials=100_000)
+        axes = Axes(x_range=[0, 1, 0.25], y_range=[0, 1, 0.25], x_length=3, y_length=2.5, tips=False).to_corner(DR)
+        cost_curve = axes.plot_line_graph(loads, curves["needless_deferral"][:, 0], line_color=ORANGE, add_vertex_dots=False)
+        delivered_curve = axes.plot_line_graph(loads, curves["delivered"][:, 0], line_color=GREEN, add_vertex_dots=False)
+        legend = VGroup(
+            text_label("needless deferral", 18, ORANGE), text_label("delivered", 18, GREEN)
+        ).arrange(DOWN, aligned_edge=LEFT).next_to(axes, UP)
+        load_label = text_label("offered load", 18).next_to(axes, DOWN)
+        self.play(Create(axes), Write(load_label), Write(legend))
+        self.play(Create(cost_curve), Create(delivered_curve))
@@ -4,44 +4,51 @@ import random
 import matplotlib.pyplot as plt
 import math
 
-class FastLoop(Scene):
+from channel_assignment import conflict_graph, reassign_after_radar
+from coverage_map import CoverageMap
+from frame_parallel import FrameParallel
+from histogram import BarHistogram, GrowBars
+from layer_cache import LayerCached
+from plotting import plot_vectorized
+from profiling import Profiled
+from radar_estimator import RadarEstimator
+from scoring import WEIGHT_PROFILES, ranking_rows
+from tex_batch import BatchedTex
+from topology import ap_dot, channel_label, station, tex_label
+
+WEIGHT_NAMES = ['w_1 (Intf)', 'w_2 (Airtime)', 'w_3 (BW)', 'w_4 (DFS)']
+
+class FastLoop(Profiled, BatchedTex, LayerCached, FrameParallel, Scene):
     def construct(self):
         # make three APs (Access Points) in the scene
-        AP1 = Dot([-3, -3, 0], color=BLUE)
-        AP2 = Dot([4, -3, 0], color=BLUE)
-        AP3 = Dot([0, 3, 0], color=BLUE)
+        AP1 = ap_dot([-3, -3, 0])
+        AP2 = ap_dot([4, -3, 0])
+        AP3 = ap_dot([0, 3, 0])
 
-        # Design ranges of the APs
-        range1 = Circle(radius=3, color=BLUE).move_to(AP1.get_center())
-        range2 = Circle(radius=4, color=BLUE).move_to(AP2.get_center())
-        range3 = Circle(radius=5, color=BLUE).move_to(AP3.get_center())
+        # Ranges of the APs, one coverage raster in place of three translucent circles
+        ranges = CoverageMap([AP1.get_center(), AP2.get_center(), AP3.get_center()], [3, 4, 5], [100, 96, 52])
 
-        channel_label1 = MathTex("CH = 100", font_size=32, color=BLUE).next_to(AP1, DOWN)
-        channel_label2 = MathTex("CH = 96", font_size=32, color=BLUE).next_to(AP2, DOWN)
-        channel_label3 = MathTex("CH = 52", font_size=32, color=BLUE).next_to(AP3, DOWN)
-
-        # fill circles with transparent color
-        range1.set_fill(BLUE, opacity=0.1)
-        range2.set_fill(BLUE, opacity=0.1)
-        range3.set_fill(BLUE, opacity=0.1)
+        channel_label1 = channel_label(100).next_to(AP1, DOWN)
+        channel_label2 = channel_label(96).next_to(AP2, DOWN)
+        channel_label3 = channel_label(52).next_to(AP3, DOWN)
 
 
         # self.play(Create(AP1), Create(AP2), Create(AP3))
         # self.play(Create(range1), Create(range2), Create(range3))
         # self.play(Create(channel_label1), Create(channel_label2), Create(channel_label3))
         self.add(AP1, AP2, AP3,
-                 range1, range2, range3,
+                 ranges,
                  channel_label1, channel_label2, channel_label3)
         stas = []
         for _ in range(4):
             x = random.uniform(-6, 6)
             y = random.uniform(-4, 4)
-            sta = Dot([x, y, 0], color=GREEN)
+            sta = station([x, y, 0])
             stas.append(sta)
             self.add(sta)
 
         radar = Dot([1, 1, 0], color=RED)
-        radar_label = MathTex("RADAR", font_size=32, color=RED).next_to(radar, DOWN)
+        radar_label = tex_label("RADAR", 32, RED).next_to(radar, DOWN)
         self.play(Create(radar), Write(radar_label))
 
         # make radar blink with oscillating radius animation
@@ -56,7 +63,7 @@ class FastLoop(Scene):
         # clear the stuff
         self.play(
             FadeOut(AP1), FadeOut(AP2), FadeOut(AP3), 
-            FadeOut(range1), FadeOut(range2), FadeOut(range3),
+            FadeOut(ranges),
             FadeOut(channel_label1), FadeOut(channel_label2), FadeOut(channel_label3),
             FadeOut(radar), FadeOut(radar_label),
             FadeOut(*stas)
@@ -75,14 +82,17 @@ class FastLoop(Scene):
         bins = 30 # histogram bins
 
 
-        # Generate samples
-        samples = np.random.normal(loc=mu, scale=sigma, size=N)
+        # Stream the samples into the estimator in chunks, as radar events would arrive
+        estimator = RadarEstimator(mu - 4 * sigma, mu + 4 * sigma, bins=bins)
+        for _ in range(50):
+            estimator.update(np.random.normal(loc=mu, scale=sigma, size=N // 50))
 
 
-        # Compute histogram (density=True so heights approximate PDF)
-        counts, edges = np.histogram(samples, bins=bins, density=True)
-        bin_width = edges[1] - edges[0]
-        bin_centers = (edges[:-1] + edges[1:]) / 2.0
+        # Histogram straight from the estimator state (density, so heights approximate PDF)
+        counts = estimator.density()
+        edges = estimator.edges
+        bin_width = estimator.bin_width
+        bin_centers = estimator.centers
 
 
         # Create axes
@@ -104,21 +114,8 @@ class FastLoop(Scene):
         self.add(axes, x_label, y_label)
 
 
-        # Draw histogram bars
-        bars = VGroup()
-        for (center, height) in zip(bin_centers, counts):
-            # create a rectangle for each bin
-            left = center - 0.5 * bin_width
-            rect = Rectangle(
-                width=axes.x_axis.unit_size * bin_width,
-                height=axes.y_axis.unit_size * height,
-                stroke_width=0,
-                fill_opacity=0.8,
-            )
-            # position rect: axes.coords_to_point maps (x, y) to scene coords
-            rect.move_to(axes.c2p(center, height / 2))
-            rect.set_fill(BLUE)
-            bars.add(rect)
+        # Draw histogram bars, all bins in a single mobject
+        bars = BarHistogram(axes, counts, edges, fill_color=BLUE, fill_opacity=0.8)
 
         labels = []
 
@@ -130,15 +127,11 @@ class FastLoop(Scene):
             labels.append(label)
             self.add(label)
 
-        self.play(LaggedStart(*[GrowFromCenter(b) for b in bars], lag_ratio=0.02), run_time=2)
-
-
-        # Analytical Gaussian PDF for overlay
-        def gaussian_pdf(x):
-            return 1.0 / (sigma * math.sqrt(2 * math.pi)) * math.exp(-0.5 * ((x - mu) / sigma) ** 2)
+        self.play(GrowBars(bars, lag_ratio=0.02), run_time=2)
 
 
-        graph = axes.plot(gaussian_pdf, x_range=[x_min, x_max])
+        # Gaussian fitted by the estimator for overlay
+        graph = plot_vectorized(axes, estimator.pdf, x_range=[x_min, x_max])
         graph.set_stroke(width=3)
 
         self.play(Create(graph), run_time=2)
@@ -186,54 +179,19 @@ class FastLoop(Scene):
         # Add a line saying , w1 , w2 , w3 , w4 were taken to increase the QoE of the network for different senarioes.
 
 
-        # Actual weight configurations from adaptive_weights_controller.py
-        table2 = Table(
-            [
-                [r'\text{Weight}', r'\text{Value}'],
-                ['w_1 (Intf)', '0.25'],
-                ['w_2 (Airtime)', '0.25'],
-                ['w_3 (BW)', '0.45'],
-                ['w_4 (DFS)', '0.15']
-            ],
-            include_outer_lines=True,
-            element_to_mobject=lambda el: MathTex(el, font_size=48)
-        ).scale(0.55)
+        # Weight profiles the adaptive_weights_controller.py switches between
+        def weight_table(level):
+            return Table(
+                [[r'\text{Weight}', r'\text{Value}']]
+                + [[name, f"{w:g}"] for name, w in zip(WEIGHT_NAMES, WEIGHT_PROFILES[level])],
+                include_outer_lines=True,
+                element_to_mobject=lambda el: MathTex(el, font_size=48)
+            ).scale(0.55)
 
-        table3 = Table(
-            [
-                [r'\text{Weight}', r'\text{Value}'],
-                ['w_1 (Intf)', '0.35'],
-                ['w_2 (Airtime)', '0.25'],
-                ['w_3 (BW)', '0.15'],
-                ['w_4 (DFS)', '0.25']
-            ],
-            include_outer_lines=True,
-            element_to_mobject=lambda el: MathTex(el, font_size=48)
-        ).scale(0.55)
-
-        table4 = Table(
-            [
-                [r'\text{Weight}', r'\text{Value}'],
-                ['w_1 (Intf)', '0.25'],
-                ['w_2 (Airtime)', '0.25'],
-                ['w_3 (BW)', '0.45'],
-                ['w_4 (DFS)', '0.15']
-            ],
-            include_outer_lines=True,
-            element_to_mobject=lambda el: MathTex(el, font_size=48)
-        ).scale(0.55)
-
-        table5 = Table(
-            [
-                [r'\text{Weight}', r'\text{Value}'],
-                ['w_1 (Intf)', '0.45'],
-                ['w_2 (Airtime)', '0.375'],
-                ['w_3 (BW)', '0.15'],
-                ['w_4 (DFS)', '0.125']
-            ],
-            include_outer_lines=True,
-            element_to_mobject=lambda el: MathTex(el, font_size=48)
-        ).scale(0.55)
+        table2 = weight_table("High Load")
+        table3 = weight_table("Medium Load")
+        table4 = weight_table("Low Load")
+        table5 = weight_table("No Load")
         
         # show all these tables from table2 to table5 in one page in each quarter of the screen
         table2.to_corner(UL).shift(RIGHT * 0.5)
@@ -258,18 +216,18 @@ class FastLoop(Scene):
             FadeOut(table2_text), FadeOut(table3_text), FadeOut(table4_text), FadeOut(table5_text)
         )
 
+        # fallback candidates for AP3, scored with the high load weights (higher score = better candidate)
+        fallback = [46, 48, 50, 52, 54, 56, 58, 60]
+        table_rows, fallback_scores = ranking_rows(
+            fallback,
+            interference=np.array([0.20, 0.80, 0.80, 0.60, 0.40, 0.20, 0.20, 0.05]),
+            airtime=np.array([0.05, 0.05, 0.25, 0.10, 0.15, 0.05, 0.05, 0.05]),
+            bandwidth=np.full(len(fallback), 0.25),
+            dfs_prob=np.array([0.7, 0.8, 1.0, 1.0, 1.0, 0.8, 0.7, 0.5]),
+            weights=WEIGHT_PROFILES["High Load"],
+        )
         table_end = Table(
-            [
-                ['Channel', 'Interference', 'RADAR probability', 'Air time utilization','score'],
-                ['46', 'Low', '0.7', '5','0.32'],
-                ['48', 'Very High', '0.8', '5','0.12'],
-                ['50', 'Very High', '1.0', '25','0.05'],
-                ['52', 'High', '1,0', '10','0.22'],
-                ['54', 'Medium', '1.0', '15','0.18'],
-                ['56', 'Low','0.8', '5','0.25'],
-                ['58', 'Low', '0.7', '5','0.30'],
-                ['60', 'Very Low', '0.5', '5','0.40']
-            ],
+            table_rows,
             include_outer_lines=True,
             line_config={"stroke_width": 2},
         ).scale(0.5)
@@ -282,9 +240,14 @@ class FastLoop(Scene):
 
         self.play(
             Create(AP1), Create(AP2), Create(AP3),
-            Create(range1), Create(range2), Create(range3),
+            FadeIn(ranges),
             Create(channel_label1), Create(channel_label2), Create(channel_label3),
             *[Create(sta) for sta in stas]
         )
 
-        self.play(Transform(channel_label3, MathTex("CH = 100", font_size=32, color=BLUE).next_to(AP3, DOWN)))
\ No newline at end of file
+        # AP3 heard the radar: move it off CH 52 to the best scored fallback that no overlapping AP uses
+        new_channels = reassign_after_radar(
+            conflict_graph([AP1.get_center(), AP2.get_center(), AP3.get_center()], [3, 4, 5]),
+            [100, 96, 52], 52, fallback, affected=[2], preference=fallback_scores,
+        )
+        self.play(Transform(channel_label3, channel_label(int(new_channels[2])).next_to(AP3, DOWN)))
\ No newline at end of file
@@ -1,6 +1,9 @@
 from manim import *
 
-class FirstPassScene(Scene):
+from connections import ConnectionSet, DrawConnections
+from profiling import Profiled
+
+class FirstPassScene(Profiled, Scene):
     def construct(self):
         # make the time scale faster
         self.time_scale = 2.0
@@ -30,20 +33,16 @@ class FirstPassScene(Scene):
         print(LEFT + DOWN)
         print(RIGHT + DOWN)
 
-        sta1 = Dot(ORIGIN + [0.5, 0.5, 0], color=GREEN)
-        line1 = DashedLine(aps[0].get_center(), sta1.get_center(), dash_length=0.1, color=YELLOW)
-
-        self.play(Create(sta1), run_time=run_time)
-        self.play(Write(line1), run_time=run_time)
-
-        sta2 = Dot(ORIGIN + [-0.4, -0.3, 0], color=GREEN)
-        line2 = DashedLine(aps[1].get_center(), sta2.get_center(), dash_length=0.1, color=YELLOW)
-
-        self.play(Create(sta2), run_time=run_time)
-        self.play(Write(line2), run_time=run_time)
+        sta_positions = [
+            ORIGIN + [0.5, 0.5, 0],
+            ORIGIN + [-0.4, -0.3, 0],
+            ORIGIN + [-0.3, 0.4, 0],
+        ]
+        # AP1 -> STA1, AP2 -> STA2, AP3 -> STA3, all hidden until drawn
+        lines = ConnectionSet(ap_positions[:3], sta_positions, dash_length=0.1, color=YELLOW, progress=0)
 
-        sta3 = Dot(ORIGIN + [-0.3, 0.4, 0], color=GREEN)
-        line3 = DashedLine(aps[2].get_center(), sta3.get_center(), dash_length=0.1, color=YELLOW)
+        for i, sta_pos in enumerate(sta_positions):
+            sta = Dot(sta_pos, color=GREEN)
 
-        self.play(Create(sta3), run_time=run_time)
-        self.play(Write(line3), run_time=run_time)
+            self.play(Create(sta), run_time=run_time)
+            self.play(DrawConnections(lines, [i]), run_time=run_time)
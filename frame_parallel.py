@@ -0,0 +1,106 @@
+# frame-parallel rendering inside one play()
+#
+#   MANIM_FRAME_WORKERS=4 manim -qh fastloop.py FastLoop
+#
+# play_internal() renders the frames of an animation strictly one after the
+# other. Without updaters a frame only depends on its time: interpolate(alpha)
+# rebuilds every animated mobject from its starting copy. So for a long play()
+# FrameParallel forks the scene right after begin_animations() (and the static
+# frame), worker w renders frames w, w + k, w + 2k, ... and streams the raw
+# pixel arrays back over a pipe, and the parent hands them to the renderer in
+# order, i.e. to the file writer and the encoder as before. The parent then
+# moves its mobjects to the end state and finishes the animations as usual.
+#
+# plays with updaters, wait_until, Succession, shorter than
+# min_parallel_frames or skipped render serially; needs fork (Linux / macOS).
+# MANIM_FRAME_WORKERS=0 or unset renders everything serially
+from manim import *
+import multiprocessing
+import os
+
+
+def _sequential(animation):
+    # Succession (and groups holding one) begins each part from where the
+    # previous one stopped, so a frame is not a function of its time alone
+    if isinstance(animation, Succession):
+        return True
+    return any(_sequential(a) for a in getattr(animation, "animations", ()))
+
+
+class FrameParallel:
+    # mixin, put it right before the Scene class: class FastLoop(Profiled, BatchedTex, LayerCached, FrameParallel, Scene)
+    min_parallel_frames = 24
+
+    def setup(self):
+        super().setup()
+        workers = os.environ.get("MANIM_FRAME_WORKERS", "0")
+        self.frame_workers = os.cpu_count() if workers == "auto" else int(workers)
+
+    def parallel_frames_possible(self, skip_rendering):
+        if (
+            self.frame_workers < 2 or skip_rendering or self.skip_animation_preview
+            or self.renderer.skip_animations or self.stop_condition is not None
+            or not hasattr(self.renderer, "static_image")
+            or "fork" not in multiprocessing.get_all_start_methods()
+        ):
+            return False
+        if self.updaters or any(mob.updaters for mob in self.get_mobject_family_members()):
+            return False
+        return not any(
+            _sequential(a) or a.mobject.get_family_updaters() for a in self.animations
+        )
+
+    def play_internal(self, skip_rendering=False):
+        if not self.parallel_frames_possible(skip_rendering):
+            return super().play_internal(skip_rendering)
+        self.duration = self.get_run_time(self.animations)
+        self.time_progression = self._get_animation_time_progression(self.animations, self.duration)
+        times = list(self.time_progression.iterable)
+        if len(times) < self.min_parallel_frames:
+            self.time_progression.close()
+            return super().play_internal(skip_rendering)
+
+        k = min(self.frame_workers, len(times))
+        context = multiprocessing.get_context("fork")
+        workers = []
+        try:
+            for w in range(k):
+                receive, send = context.Pipe(duplex=False)
+                process = context.Process(target=self._render_frames, args=(times[w::k], send))
+                process.start()
+                send.close()
+                workers.append((process, receive))
+            shape, dtype = self.renderer.camera.pixel_array.shape, self.renderer.camera.pixel_array.dtype
+            for i in range(len(times)):
+                process, receive = workers[i % k]
+                try:
+                    frame = np.frombuffer(receive.recv_bytes(), dtype=dtype).reshape(shape)
+                except EOFError:
+                    process.join()
+                    raise RuntimeError(f"frame worker {i % k} exited with code {process.exitcode}") from None
+                self.renderer.add_frame(frame)
+                self.time_progression.update(1)
+        finally:
+            for process, receive in workers:
+                receive.close()
+                process.join(timeout=1)
+                if process.is_alive():
+                    process.terminate()
+
+        # the rest is play_internal() after its frame loop
+        self.update_to_time(times[-1])
+        for animation in self.animations:
+            animation.finish()
+            animation.clean_up_from_scene(self)
+        self.update_mobjects(0)
+        self.renderer.static_image = None
+        self.time_progression.close()
+
+    def _render_frames(self, times, send):
+        # forked worker: the scene as it was at the start of the play
+        for t in times:
+            self.update_to_time(t)
+            self.renderer.update_frame(self, self.moving_mobjects)
+            # flat, send_bytes slices a multi-dimensional buffer along its first axis
+            send.send_bytes(self.renderer.get_frame().reshape(-1))
+        send.close()
@@ -1,30 +1,67 @@
 from manim import *
 
-class HiddenNode(Scene):
+from connections import ConnectionSet, DrawConnections
+from coverage_map import CoverageMap
+from csma import links, sweep
+from layer_cache import LayerCached
+from node_problems import find_hidden
+from profiling import Profiled
+from topology import ap_dot, station, text_label
+
+class HiddenNode(Profiled, LayerCached, Scene):
     def construct(self):
         # Make background black
         self.camera.background_color = BLACK
 
         # Main AP
-        main_ap = Dot(ORIGIN + LEFT, color=BLUE)
-        main_label = Text("Associated AP", font_size=24).next_to(main_ap, DOWN).shift(LEFT * 0.5)
+        main_ap = ap_dot(ORIGIN + LEFT)
+        main_label = text_label("Associated AP").next_to(main_ap, DOWN).shift(LEFT * 0.5)
 
         # STA connected to main AP
-        sta = Dot(ORIGIN + UP, color=GREEN)
-        sta_label = Text("STA", font_size=24).next_to(sta, UP)
+        sta = station(ORIGIN + UP)
+        sta_label = text_label("STA").next_to(sta, UP)
 
         # Hidden Node AP (not connected)
-        hidden_ap = Dot(ORIGIN + RIGHT, color=RED)
-        hidden_label = Text("Hidden Node AP", font_size=24).next_to(hidden_ap, DOWN).shift(RIGHT * 0.5)
+        hidden_ap = ap_dot(ORIGIN + RIGHT, RED)
+        hidden_label = text_label("Hidden Node AP").next_to(hidden_ap, DOWN).shift(RIGHT * 0.5)
 
         # Add all elements to the scene
         self.add(main_ap, main_label, sta, sta_label, hidden_ap, hidden_label)
 
-        # show the main AP's range pulsing but not too big
-        ap_range = Circle(radius=1, color=BLUE, fill_opacity=0.1).move_to(main_ap.get_center())
-        hidden_range = Circle(radius=1, color=RED, fill_opacity=0.1).move_to(hidden_ap.get_center())
-        # self.add(Create(ap_range), Create(hidden_range))
-        self.add(ap_range, hidden_range)
-        self.play(ap_range.animate.scale(1.6).set_fill(opacity=0.2), hidden_range.animate.scale(1.6).set_fill(opacity=0.2), run_time=1)
-        self.play(ap_range.animate.scale(10/16).set_fill(opacity=0.1), hidden_range.animate.scale(10/16).set_fill(opacity=0.1), run_time=1)
+        # APs reach (and hear) as far as their range pulses; the coverage is
+        # computed once at full reach and the pulse (range 1 -> reach -> 1,
+        # opacity 0.1 -> 0.2 -> 0.1) only rescales it
+        reach = 1.6
+        ap_positions = np.array([main_ap.get_center(), hidden_ap.get_center()])
+        sta_positions = np.array([sta.get_center()])
+        sta_ap = [0]
+        ranges = CoverageMap(ap_positions, reach, colors=[BLUE, RED]).set_range_scale(1 / reach, opacity=0.1)
+        self.add(ranges)
+        self.play(UpdateFromAlphaFunc(ranges, lambda m, a: m.set_range_scale((1 + (reach - 1) * a) / reach, 0.1 + 0.1 * a)), run_time=1)
+        self.play(UpdateFromAlphaFunc(ranges, lambda m, a: m.set_range_scale((reach - (reach - 1) * a) / reach, 0.2 - 0.1 * a)), run_time=1)
+
+        # every (AP, STA, hidden AP) triple: the hidden AP reaches the STA but cannot hear its AP
+        triples = find_hidden(ap_positions, sta_positions, sta_ap, reach)
+        interference = ConnectionSet(ap_positions[triples[:, 2]], sta_positions[triples[:, 1]], color=RED, progress=0)
+        deaf = ConnectionSet(ap_positions[triples[:, 0]], ap_positions[triples[:, 2]], color=GRAY, opacity=0.6, progress=0)
+        count = text_label(f"hidden-node triples: {len(triples)}", color=RED).to_edge(UP)
+        self.play(DrawConnections(interference), DrawConnections(deaf), Write(count), run_time=1)
 
+        # measured cost for the STA's link: CSMA/CA rounds at increasing offered load
+        # the hidden AP sends to its own STA on its far side, out of the associated AP's reach
+        away = normalize(hidden_ap.get_center() - main_ap.get_center())
+        hidden_sta = station(hidden_ap.get_center() + away * 0.75 * reach)
+        hidden_sta_label = text_label("its STA", 18).next_to(hidden_sta, UP)
+        self.play(FadeIn(hidden_sta), Write(hidden_sta_label))
+        senses, reaches = links(ap_positions, reach, rx_pos=[sta.get_center(), hidden_sta.get_center()])
+        loads = np.linspace(0.05, 1, 20)
+        curves = sweep(senses, reaches, loads, trials=100_000)
+        axes = Axes(x_range=[0, 1, 0.25], y_range=[0, 1, 0.25], x_length=3, y_length=2.5, tips=False).to_corner(DR)
+        cost_curve = axes.plot_line_graph(loads, curves["collision"][:, 0], line_color=RED, add_vertex_dots=False)
+        delivered_curve = axes.plot_line_graph(loads, curves["delivered"][:, 0], line_color=GREEN, add_vertex_dots=False)
+        legend = VGroup(
+            text_label("collision", 18, RED), text_label("delivered", 18, GREEN)
+        ).arrange(DOWN, aligned_edge=LEFT).next_to(axes, UP)
+        load_label = text_label("offered load", 18).next_to(axes, DOWN)
+        self.play(Create(axes), Write(load_label), Write(legend))
+        self.play(Create(cost_curve), Create(delivered_curve))
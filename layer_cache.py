@@ -0,0 +1,175 @@
+# static layer caching during play()
+#
+# manim already rasterizes the static mobjects once per play() into a
+# background, but only those below the first moving mobject in z order:
+# everything drawn after it is re-drawn on every frame, moving or not. With
+# a pulse or a highlight on top of the map that is fine; an animated map
+# (or label) under all the static APs, ranges and tables is not.
+#
+# LayerCached splits the display order of a play() into runs: the static
+# run at the bottom becomes manim's background as before, every other static
+# run is rasterized once onto a transparent layer (cropped to what it covers,
+# premultiplied alpha like cairo draws), and each frame the moving runs are
+# drawn and the cached layers composited over them in order, so the frame
+# time follows what animates. 3D cameras re-sort every frame, so scenes with
+# one keep manim's behaviour.
+#
+# mixin, put it before the Scene class: class FastLoop(Profiled, BatchedTex, LayerCached, Scene)
+from manim import *
+import itertools as it
+
+from manim.utils.family import extract_mobject_family_members
+
+
+def premultiply(layer):
+    # images and point clouds are written straight, cairo output is premultiplied
+    alpha = layer[..., 3:].astype(np.uint16)
+    layer[..., :3] = (layer[..., :3] * alpha + 127) // 255
+    return layer
+
+
+class Layer:
+    def __init__(self, pixels):
+        # keep only the rows / columns the layer covers
+        covered = pixels[..., 3] > 0
+        rows, cols = np.flatnonzero(covered.any(axis=1)), np.flatnonzero(covered.any(axis=0))
+        self.empty = len(rows) == 0
+        if self.empty:
+            return
+        self.window = np.s_[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+        crop = pixels[self.window]
+        self.pixels = crop.astype(np.uint16)
+        self.transparency = 255 - self.pixels[..., 3:]
+
+    def composite(self, frame):
+        # layer over frame, both premultiplied
+        if self.empty:
+            return
+        below = frame[self.window]
+        below[:] = self.pixels + (below * self.transparency + 127) // 255
+
+
+class LayerCached:
+    def setup(self):
+        super().setup()
+        self._layer_plan = None
+        renderer = self.renderer
+        # the OpenGL renderer has no static frame, 3D cameras re-sort every frame
+        if not hasattr(renderer, "save_static_frame_data") or isinstance(renderer.camera, ThreeDCamera):
+            return
+        save_static_frame_data = renderer.save_static_frame_data
+        update_frame = renderer.update_frame
+
+        def save_static_and_layers(scene, static_mobjects):
+            image = save_static_frame_data(scene, static_mobjects)
+            # planned here, after begin_animations(): Transform.begin() pads
+            # the submobjects of what it animates
+            self._layer_plan = None if renderer.skip_animations else self.plan_layers()
+            return image
+
+        def layered_update_frame(scene, mobjects=None, include_submobjects=True, ignore_skipping=True, **kwargs):
+            # add() during an animation rebuilds moving_mobjects, drawn the stock way from then on
+            if self._layer_plan is None or mobjects is not self._layer_source:
+                return update_frame(scene, mobjects, include_submobjects, ignore_skipping, **kwargs)
+            if renderer.skip_animations and not ignore_skipping:
+                return
+            camera = renderer.camera
+            if renderer.static_image is not None:
+                camera.set_frame_to_background(renderer.static_image)
+            else:
+                camera.reset()
+            for roots, layer in self._layer_plan:
+                if layer is None:
+                    # families extracted again every frame, like the stock path,
+                    # animations may swap submobjects (ConnectionSet.refresh)
+                    camera.capture_mobjects(roots, include_submobjects=True)
+                else:
+                    layer.composite(camera.pixel_array)
+
+        renderer.save_static_frame_data = save_static_and_layers
+        renderer.update_frame = layered_update_frame
+
+    def rasterize_layer(self, members):
+        # one static run on a transparent frame, drawn type by type so each
+        # part can be brought to premultiplied alpha before it is stacked
+        camera = self.renderer.camera
+        shape = camera.pixel_array.shape
+        stacked = np.zeros(shape, dtype=camera.pixel_array.dtype)
+        for is_vector, group in it.groupby(members, key=lambda m: isinstance(m, VMobject)):
+            camera.set_pixel_array(np.zeros(shape, dtype=camera.pixel_array.dtype))
+            camera.capture_mobjects(list(group), include_submobjects=False)
+            part = camera.pixel_array.copy()
+            if not is_vector:
+                premultiply(part)
+            Layer(part).composite(stacked)
+        return Layer(stacked)
+
+    def plan_layers(self):
+        # (moving roots, None) and (static members, Layer) runs of moving_mobjects
+        moving = self.moving_mobjects
+        if not moving:
+            return None
+        # manim counts everything after the first mover as moving, keep only
+        # the families that really animate or update
+        animated = [anim.mobject for anim in self.animations] + [
+            mob for mob in self.get_mobject_family_members() if mob.updaters
+        ]
+        really_moving = {id(m) for m in extract_mobject_family_members(animated)}
+        runs = [
+            (list(run), is_static)
+            for is_static, run in it.groupby(moving, key=lambda m: id(m) not in really_moving)
+        ]
+        if not any(is_static for _, is_static in runs):
+            return None
+        roots = {}
+        for k, (members, is_static) in enumerate(runs):
+            if is_static:
+                continue
+            roots[k] = self.run_roots(members)
+            # a z_index that takes a child out of its parent's run would draw it twice
+            drawn = extract_mobject_family_members(
+                roots[k], use_z_index=self.renderer.camera.use_z_index, only_those_with_points=True,
+            )
+            if {id(m) for m in drawn} != {id(m) for m in members if m.has_points()}:
+                return None
+        self._layer_source = moving
+        return [
+            (members, self.rasterize_layer(members)) if is_static else (roots[k], None)
+            for k, (members, is_static) in enumerate(runs)
+        ]
+
+    def run_roots(self, members):
+        # top-most members of a moving run, parents come before their children
+        roots, covered = [], set()
+        for mob in members:
+            if id(mob) not in covered:
+                roots.append(mob)
+                covered.update(map(id, mob.get_family()))
+        return roots
+
+
+if __name__ == "__main__":
+    # python layer_cache.py: a Transform between Texts with different glyph
+    # counts under a static cover renders the same frames as stock manim
+    class TransformCheck(Scene):
+        def construct(self):
+            title = Text("Scan")
+            self.add(Square(4, fill_opacity=0.5), title, Rectangle(width=6, height=1, fill_opacity=0.4).shift(DOWN * 0.2))
+            self.play(Transform(title, Text("Scoring channels")))
+            self.play(Transform(title, Text("AP").shift(UP)))
+
+    class LayeredTransformCheck(LayerCached, TransformCheck):
+        pass
+
+    def frames(scene_class):
+        scene = scene_class()
+        captured = []
+        scene.renderer.add_frame = lambda frame, num_frames=1: captured.append(frame.copy())
+        scene.render()
+        return np.array(captured, dtype=int)
+
+    with tempconfig({"quality": "low_quality", "dry_run": True, "disable_caching": True, "progress_bar": "none"}):
+        stock, layered = frames(TransformCheck), frames(LayeredTransformCheck)
+    error = np.abs(stock - layered).max() if stock.shape == layered.shape else None
+    print(f"{len(stock)} / {len(layered)} frames, largest difference {error}")
+    assert error is not None and error <= 1
@@ -2,27 +2,39 @@
 from manim import *
 from matplotlib.dviread import Box
 import numpy as np
-class Mesh3D(ThreeDScene):
+
+from connections import ConnectionSet, DrawConnections, Retarget
+from culling import Culled
+from mesh_routing import BackhaulRouter, link_graph
+from point_cloud import PointCloud3D
+from profiling import Profiled
+from tex_batch import BatchedTex
+
+class Mesh3D(Profiled, BatchedTex, Culled, ThreeDScene):
     def construct(self):
         # make background white
         self.camera.background_color = BLACK
         # make camera perspective
 
 
-        # Create a grid of points in 3D space
-        points = []
+        # Create a grid of points in 3D space, all APs in one point cloud
+        lattice = 100  # APs per side
         grid_size = 2
         spacing = 2.5
-        for x in range(-grid_size, grid_size + 1):
-            for y in range(-grid_size, grid_size + 1):
-                z = 0  # Flat grid on the z=0 plane
-                point = Dot3D(point=np.array([x * spacing, -y * 0.4, y * spacing]), color=rgb_to_color(rgb=(0.2, 0.6, 0.8)))
-                point_label = MathTex(r'AP_{(%d,%d)}' % (x, y), font_size=16, color=WHITE).next_to(point, RIGHT)
-                if (x, y) == (2, 2):
-                    point_label = MathTex(r'AP_{(%d,%d)}' % (x, y), font_size=16, color=WHITE).next_to(point, LEFT)
-
-                points.append(point)
-                self.add(point, point_label)
+        u, v = np.meshgrid(np.linspace(-grid_size, grid_size, lattice), np.linspace(-grid_size, grid_size, lattice))
+        u, v = u.ravel(), v.ravel()
+        ap_positions = np.stack([u * spacing, -v * 0.4, v * spacing], axis=1)
+        step = 2 * grid_size * spacing / (lattice - 1)
+        points = PointCloud3D(ap_positions, color=rgb_to_color(rgb=(0.2, 0.6, 0.8)), radius=min(DEFAULT_DOT_RADIUS, 0.35 * step))
+        points.face_camera(self.camera)
+        self.add(points)
+        # Label the corner APs only, a label per AP would bury the lattice
+        last = lattice - 1
+        for i, j in [(0, 0), (last, 0), (0, last), (last, last)]:
+            point = ap_positions[j * lattice + i]
+            point_label = MathTex(r'AP_{(%d,%d)}' % (i, j), font_size=16, color=WHITE)
+            point_label.next_to(point, RIGHT if i == 0 else LEFT)
+            self.add(point_label)
 
         # Create a central hub, which is a cuboid elevated above the grid
         # hub = Cube(side_length=1, fill_color=RED, fill_opacity=1).shift([0, 2, 0])
@@ -40,18 +52,45 @@ class Mesh3D(ThreeDScene):
         # [3.062173323406009, 3.2865216781199544],
         [-1.7815548324983064, 2.827702505041385],
         [1.9840035118790702, 3.3898106761232247]]
-        for sta in stas:
-            x = sta[0]
-            y = sta[1]
-            sta = Dot3D(point=np.array([x, -2, y]), color=GREEN)
-            print(x, y)
+        sta_positions = np.array([[x, -2, y] for x, y in stas])
+        sta_points = PointCloud3D(sta_positions, color=GREEN).face_camera(self.camera)
+        self.add(sta_points)
+        for sta in sta_positions:
             sta_label = MathTex("STA", font_size=24, color=GREEN).next_to(sta, DOWN)
-            self.add(sta, sta_label)
+            self.add(sta_label)
         self.add(hub, hub_label)
 
-        # Connect each point in the grid to the hub with lines
-        # for point in points:
-        #     line = Line3D(start=point.get_center(), end=hub.get_center(), color=GREEN)
-        #     self.add(line)
+        # Connect the grid to the hub through the mesh: backhaul routes over
+        # AP-to-AP links (about 10 m apart), the hub has high gain antennas
+        nodes = np.vstack([ap_positions, hub.get_center()])
+        hub_index = len(nodes) - 1
+        gain = np.zeros(len(nodes))
+        gain[hub_index] = 28.0
+        router = BackhaulRouter(link_graph(nodes, antenna_gain=gain, meters_per_unit=100), hub_index)
+        child, parent = router.links()
+        link_of = np.full(len(nodes), -1)
+        link_of[child] = np.arange(len(child))
+        # links colored by the load they carry, log scale from leaf links to hub links
+        palette = [BLUE_E, TEAL, GREEN, YELLOW, RED]
+
+        def load_colors():
+            load = np.maximum(router.load[child], 1)
+            # at least 2 on top, or links carrying at most 1 would divide by log(1) = 0
+            tier = np.minimum((np.log(load) / np.log(max(load.max(initial=1), 2)) * len(palette)).astype(int), len(palette) - 1)
+            return [palette[t] for t in tier]
+
+        routes = ConnectionSet(nodes[child], nodes[parent], color=load_colors(), dashed_ratio=1.0, stroke_width=1)
+        self.play(DrawConnections(routes), run_time=2)
+        self.wait(1)
 
+        # The busiest hub link fails, only the subtree behind it is re-routed
+        hub_links = child[parent == hub_index]
+        failed = hub_links[np.argmax(router.load[hub_links])]
+        changed = router.fail_link(failed, hub_index)
+        new_parent = router.parent[changed]
+        self.play(
+            Retarget(routes, nodes[np.where(new_parent >= 0, new_parent, changed)], link_of[changed]),
+            run_time=1.5
+        )
+        routes.set_link_style(color=load_colors())
         self.wait(2)
\ No newline at end of file
@@ -0,0 +1,111 @@
+# batched least-squares multilateration
+#
+# distances is an (n_sta, n_aps) array of noisy AP -> STA range measurements
+# (nan where an AP did not hear the STA) and every STA is solved at once:
+#   1. linear start: |x|^2 - 2 a_k.x = d_k^2 - |a_k|^2 is linear in (x, |x|^2),
+#      one weighted normal equation per STA, all solved in one batched call
+#   2. a few Gauss-Newton steps on the actual ranges |x - a_k| - d_k
+#   3. covariance sigma^2 (J^T W J)^-1 at the solution, with sigma either the
+#      known range noise or estimated from the residuals
+# everything is (n_sta, ...) arrays, ~100k STAs in well under a second
+# (python multilateration.py to check)
+import numpy as np
+
+
+def _batched(op, M, ok):
+    # op over every STA's system; STAs without enough ranges, or whose system
+    # turns out singular, are dropped from ok and get an identity system, so
+    # one of them does not fail the whole batch
+    M[~ok] = np.eye(M.shape[-1])
+    try:
+        return op(M), ok
+    except np.linalg.LinAlgError:
+        ok = ok & (np.linalg.cond(M) < 1 / np.finfo(float).eps)
+        M[~ok] = np.eye(M.shape[-1])
+        return op(M), ok
+
+
+def solve(anchors, distances, sigma=None, iterations=5):
+    anchors = np.asarray(anchors, dtype=float)
+    d = np.atleast_2d(np.asarray(distances, dtype=float))
+    n_sta, n_aps = d.shape
+    dim = anchors.shape[1]
+    heard = np.isfinite(d)
+    d = np.where(heard, d, 0.0)
+    if sigma is None:
+        w = heard.astype(float)
+    else:
+        w = heard / np.broadcast_to(np.asarray(sigma, dtype=float) ** 2, d.shape)
+
+    # linear start, unknowns (x, |x|^2)
+    A = np.hstack([-2 * anchors, np.ones((n_aps, 1))])
+    b = d ** 2 - (anchors ** 2).sum(axis=1)
+    N = np.einsum("sk,ki,kj->sij", w, A, A)
+    rhs = np.einsum("sk,ki,sk->si", w, A, b)
+    # fewer than dim + 1 ranges do not fix a position
+    x, ok = _batched(lambda M: np.linalg.solve(M, rhs[..., None])[..., :dim, 0], N, heard.sum(axis=1) > dim)
+
+    for _ in range(iterations):
+        diff = x[:, None, :] - anchors[None]
+        ranges = np.maximum(np.linalg.norm(diff, axis=2), 1e-12)
+        J = diff / ranges[..., None]
+        r = ranges - d
+        JtWJ = np.einsum("sk,ski,skj->sij", w, J, J)
+        JtWr = np.einsum("sk,ski,sk->si", w, J, r)
+        step, ok = _batched(lambda M: np.linalg.solve(M, JtWr[..., None])[..., 0], JtWJ, ok)
+        x = x - np.where(ok[:, None], step, 0.0)
+
+    diff = x[:, None, :] - anchors[None]
+    ranges = np.maximum(np.linalg.norm(diff, axis=2), 1e-12)
+    J = diff / ranges[..., None]
+    r = np.where(heard, ranges - d, 0.0)
+    cov, ok = _batched(np.linalg.inv, np.einsum("sk,ski,skj->sij", w, J, J), ok)
+    if sigma is None:
+        # a posteriori variance, needs more measurements than unknowns
+        dof = np.maximum(heard.sum(axis=1) - dim, 1)
+        cov *= ((w * r * r).sum(axis=1) / dof)[:, None, None]
+    # nan for the STAs that could not be placed
+    x[~ok] = np.nan
+    cov[~ok] = np.nan
+    return x, cov
+
+
+def error_ellipses(cov, confidence=0.95):
+    # width, height and angle of the 2d confidence ellipse of every estimate
+    values, vectors = np.linalg.eigh(np.asarray(cov)[..., :2, :2])
+    # chi-square quantile for 2 degrees of freedom
+    scale = -2 * np.log(1 - confidence)
+    width = 2 * np.sqrt(scale * values[..., 1])
+    height = 2 * np.sqrt(scale * values[..., 0])
+    angle = np.arctan2(vectors[..., 1, 1], vectors[..., 0, 1])
+    return width, height, angle
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n_sta, sigma = 100_000, 0.5
+    anchors = rng.random((6, 2)) * 100
+    truth = rng.random((n_sta, 2)) * 100
+    ranges = np.linalg.norm(truth[:, None] - anchors[None], axis=2)
+    measured = ranges + rng.normal(0, sigma, ranges.shape)
+    # every STA misses one random AP
+    measured[np.arange(n_sta), rng.integers(0, 6, n_sta)] = np.nan
+
+    for _ in range(3):
+        start = time.perf_counter()
+        x, cov = solve(anchors, measured, sigma)
+        elapsed = time.perf_counter() - start
+    error = np.linalg.norm(x - truth, axis=1)
+    predicted = np.sqrt(np.trace(cov, axis1=1, axis2=2))
+    print(f"{n_sta} STAs in {elapsed * 1000:.0f} ms, rms error {np.sqrt((error ** 2).mean()):.3f}, "
+          f"predicted {np.sqrt((predicted ** 2).mean()):.3f}")
+
+    # STAs hearing two APs or none come back as nan, the rest of the batch as before
+    measured[:2, :4] = np.nan
+    measured[2] = np.nan
+    x2, cov2 = solve(anchors, measured, sigma)
+    assert np.isnan(x2[:3]).all() and np.isnan(cov2[:3]).all()
+    assert np.allclose(x2[3:], x[3:]) and np.isfinite(cov2[3:]).all()
+    print("STAs with fewer than 3 APs: nan, the rest unchanged")
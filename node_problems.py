@@ -0,0 +1,81 @@
+# hidden-node and exposed-node triples in a whole topology
+#
+# APs have a reach (how far their transmissions interfere) and a carrier
+# sense range (how far they hear others, the reach by default); every STA is
+# associated with one AP.
+#   hidden:  (ap, sta, h)  h reaches sta, but h cannot hear ap, so both may
+#            transmit at once and collide at sta
+#   exposed: (ap, sta, e)  ap hears e and defers, although e does not reach
+#            sta, so the deferral was for nothing
+# all close pairs come out of KD-tree sparse_distance_matrix calls as flat
+# (i, j, distance) arrays and are filtered with array operations, no per
+# node loop (python node_problems.py: thousands of APs and STAs)
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+def _close_pairs(a, b, radius):
+    # rows, cols, distances of every a/b pair closer than radius
+    m = cKDTree(a).sparse_distance_matrix(cKDTree(b), radius, output_type="coo_matrix")
+    return m.row, m.col, m.data
+
+
+def find_hidden(ap_pos, sta_pos, sta_ap, reach, sense_range=None):
+    ap_pos, sta_pos = np.asarray(ap_pos, dtype=float), np.asarray(sta_pos, dtype=float)
+    sta_ap = np.asarray(sta_ap)
+    reach = np.broadcast_to(np.asarray(reach, dtype=float), len(ap_pos))
+    sense = reach if sense_range is None else np.broadcast_to(np.asarray(sense_range, dtype=float), len(ap_pos))
+    sta, h, d = _close_pairs(sta_pos, ap_pos, reach.max())
+    ap = sta_ap[sta]
+    keep = (d < reach[h]) & (h != ap)
+    sta, h, ap = sta[keep], h[keep], ap[keep]
+    # h hears ap when ap is inside h's carrier sense range
+    deaf = np.linalg.norm(ap_pos[ap] - ap_pos[h], axis=1) >= sense[h]
+    return np.stack([ap[deaf], sta[deaf], h[deaf]], axis=1)
+
+
+def find_exposed(ap_pos, sta_pos, sta_ap, reach, sense_range=None):
+    ap_pos, sta_pos = np.asarray(ap_pos, dtype=float), np.asarray(sta_pos, dtype=float)
+    sta_ap = np.asarray(sta_ap)
+    reach = np.broadcast_to(np.asarray(reach, dtype=float), len(ap_pos))
+    sense = reach if sense_range is None else np.broadcast_to(np.asarray(sense_range, dtype=float), len(ap_pos))
+    ap, e, d = _close_pairs(ap_pos, ap_pos, sense.max())
+    keep = (d < sense[ap]) & (ap != e)
+    ap, e = ap[keep], e[keep]
+    # expand every (ap, e) pair over the STAs of ap
+    order = np.argsort(sta_ap, kind="stable")
+    starts = np.searchsorted(sta_ap[order], np.arange(len(ap_pos)))
+    n_sta = np.bincount(sta_ap, minlength=len(ap_pos))[ap]
+    pair = np.repeat(np.arange(len(ap)), n_sta)
+    offset = np.arange(len(pair)) - np.repeat(np.cumsum(n_sta) - n_sta, n_sta)
+    sta = order[starts[ap[pair]] + offset]
+    ap, e = ap[pair], e[pair]
+    unreached = np.linalg.norm(ap_pos[e] - sta_pos[sta], axis=1) >= reach[e]
+    return np.stack([ap[unreached], sta[unreached], e[unreached]], axis=1)
+
+
+def worst_offenders(triples, n_aps, top=10):
+    # APs that cause the most triples (the h / e column), most first
+    counts = np.bincount(np.asarray(triples)[:, 2], minlength=n_aps)
+    worst = np.argsort(-counts, kind="stable")[:top]
+    worst = worst[counts[worst] > 0]
+    return worst, counts[worst]
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n_aps, n_stas = 5_000, 20_000
+    ap_pos = rng.random((n_aps, 2)) * 1000
+    sta_pos = rng.random((n_stas, 2)) * 1000
+    sta_ap = cKDTree(ap_pos).query(sta_pos)[1]
+
+    start = time.perf_counter()
+    hidden = find_hidden(ap_pos, sta_pos, sta_ap, reach=25.0)
+    exposed = find_exposed(ap_pos, sta_pos, sta_ap, reach=25.0, sense_range=35.0)
+    elapsed = time.perf_counter() - start
+    print(f"{n_aps} APs, {n_stas} STAs: {len(hidden)} hidden, {len(exposed)} exposed triples in {elapsed * 1000:.0f} ms")
+    for name, triples in (("hidden", hidden), ("exposed", exposed)):
+        worst, counts = worst_offenders(triples, n_aps, top=3)
+        print(f"worst {name} offenders:", ", ".join(f"AP {a} ({c})" for a, c in zip(worst, counts)))
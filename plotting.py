@@ -0,0 +1,95 @@
+# axes.plot / axes.get_area replacements for numpy-style functions
+#
+# axes.plot calls the function once per sample and get_area then walks the
+# curve points through p2c one by one. plot_vectorized evaluates the whole
+# sample array in one call, maps it to the scene with array maths, and then
+# refines only where the curve bends: each round evaluates the midpoints of
+# the intervals whose middle sample is more than `tolerance` (one pixel by
+# default) away from its chord, again in one call. plot_with_area reuses the
+# same samples for the area under the curve.
+# functions that do not take arrays still work, one call per sample
+from manim import *
+
+
+def axes_to_scene(axes, x, y):
+    # linear axes are an affine map: one origin and two unit vectors
+    if type(axes.x_axis.scaling) is LinearBase and type(axes.y_axis.scaling) is LinearBase:
+        origin = axes.c2p(0, 0)
+        ex = axes.c2p(1, 0) - origin
+        ey = axes.c2p(0, 1) - origin
+        return origin + np.asarray(x)[:, None] * ex + np.asarray(y)[:, None] * ey
+    return np.array([axes.c2p(xi, yi) for xi, yi in zip(x, y)])
+
+
+def evaluate(function, x):
+    try:
+        y = np.asarray(function(x), dtype=float)
+        if y.shape == x.shape:
+            return y
+    except (TypeError, ValueError):
+        pass
+    return np.array([function(t) for t in x], dtype=float)
+
+
+def adaptive_samples(axes, function, a, b, n, tolerance, max_depth=6):
+    x = np.linspace(a, b, n)
+    y = evaluate(function, x)
+    for _ in range(max_depth):
+        p = axes_to_scene(axes, x, y)
+        deviation = np.linalg.norm(p[1:-1] - (p[:-2] + p[2:]) / 2, axis=1)
+        bent = np.flatnonzero(deviation > tolerance)
+        if len(bent) == 0:
+            break
+        # split the intervals on both sides of every bent sample
+        intervals = np.unique(np.concatenate([bent, bent + 1]))
+        new_x = (x[intervals] + x[intervals + 1]) / 2
+        x = np.concatenate([x, new_x])
+        y = np.concatenate([y, evaluate(function, new_x)])
+        order = np.argsort(x, kind="stable")
+        x, y = x[order], y[order]
+    return x, y
+
+
+class VectorizedGraph(VMobject):
+    def __init__(self, axes, function, x_range=None, tolerance=None, use_smoothing=True, **kwargs):
+        super().__init__(**kwargs)
+        x_range = list(x_range if x_range is not None else axes.x_range[:2])
+        a, b = x_range[:2]
+        # same base density as axes.plot
+        step = x_range[2] if len(x_range) > 2 else axes.x_range[2] / axes.num_sampled_graph_points_per_tick
+        if tolerance is None:
+            tolerance = config.frame_width / config.pixel_width
+        n = max(int(np.ceil((b - a) / step)) + 1, 3)
+
+        self.axes = axes
+        self.underlying_function = function
+        self.t_min, self.t_max = a, b
+        self.x_samples, self.y_samples = adaptive_samples(axes, function, a, b, n, tolerance)
+        self.set_points_as_corners(axes_to_scene(axes, self.x_samples, self.y_samples))
+        if use_smoothing:
+            self.make_smooth()
+
+    def function(self, t):
+        # like ParametricFunction.function: the scene point of the graph at x = t
+        return self.axes.c2p(t, self.underlying_function(t))
+
+    def area(self, x_range=None, color=BLUE, opacity=0.3, **kwargs):
+        # same shape and styling as axes.get_area(graph, x_range), from the stored samples
+        a, b = x_range if x_range is not None else (self.t_min, self.t_max)
+        inside = (self.x_samples >= a) & (self.x_samples <= b)
+        x = np.concatenate([[a, a], self.x_samples[inside], [b, b]])
+        y = np.concatenate([[0, evaluate(self.underlying_function, np.array([a]))[0]],
+                            self.y_samples[inside],
+                            [evaluate(self.underlying_function, np.array([b]))[0], 0]])
+        corners = axes_to_scene(self.axes, x, y)
+        area = VMobject(**kwargs).set_points_as_corners(np.vstack([corners, corners[:1]]))
+        return area.set_opacity(opacity).set_color(color)
+
+
+def plot_vectorized(axes, function, x_range=None, **kwargs):
+    return VectorizedGraph(axes, function, x_range, **kwargs)
+
+
+def plot_with_area(axes, function, x_range=None, area_range=None, area_color=BLUE, area_opacity=0.3, **kwargs):
+    graph = VectorizedGraph(axes, function, x_range, **kwargs)
+    return graph, graph.area(area_range, area_color, area_opacity)
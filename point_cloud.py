@@ -0,0 +1,91 @@
+# 3D point cloud as a handful of VMobjects instead of one Dot3D per point
+#
+# a Dot3D is a sphere Surface, i.e. a VGroup of dozens of faces that the
+# ThreeDCamera projects, shades and depth sorts one by one. PointCloud3D keeps
+# all positions in one (n, 3) array and draws every point as the same flat
+# low-poly disc (a billboard), built for all points in one numpy pass and
+# turned to face the camera. Points are styled per point, but drawn as one
+# VMobject per distinct (color, opacity), like ConnectionSet, so a 100x100 AP
+# lattice is one point buffer.
+#
+# face_camera(camera) keeps the discs facing the camera while it moves; the
+# discs are only rebuilt when the camera orientation actually changed
+from manim import *
+
+# straight segment as a cubic bezier: anchor, two handles on the line, anchor
+_LINE_T = np.array([0.0, 1 / 3, 2 / 3, 1.0])[:, None]
+
+
+def disc_points(centers, radius, right, up, sides=6):
+    # (n * sides, 4, 3) bezier points, one closed polygon per center
+    angles = np.linspace(0, TAU, sides + 1)
+    outline = radius * (np.cos(angles)[:, None] * right + np.sin(angles)[:, None] * up)
+    corners = centers[:, None, :] + outline[None]
+    a, b = corners[:, :-1, None, :], corners[:, 1:, None, :]
+    return (a + (b - a) * _LINE_T).reshape(-1, 4, 3)
+
+
+class PointCloud3D(VGroup):
+    def __init__(self, points, color=BLUE, opacity=1.0, radius=DEFAULT_DOT_RADIUS, sides=6, **kwargs):
+        super().__init__(**kwargs)
+        self.centers = np.array(points, dtype=float).reshape(-1, 3)
+        n = len(self.centers)
+        self.colors = np.empty(n, dtype=object)
+        self.opacities = np.zeros(n)
+        self.radius = radius
+        self.sides = sides
+        # world directions of the screen's right and up, the default camera's until face() is called
+        self.right, self.up = RIGHT.astype(float), UP.astype(float)
+        self._facing = None
+        self.set_point_style(color=color, opacity=opacity)
+
+    @property
+    def n_points(self):
+        return len(self.centers)
+
+    def set_point_style(self, indices=slice(None), color=None, opacity=None):
+        # color is one color or one per selected point
+        if color is not None:
+            selected = np.arange(self.n_points)[indices]
+            colors = [color] * len(selected) if isinstance(color, (str, ManimColor)) else color
+            self.colors[selected] = [ManimColor(c).to_hex() for c in colors]
+        if opacity is not None:
+            self.opacities[indices] = opacity
+        return self.refresh()
+
+    def set_positions(self, points, indices=slice(None)):
+        self.centers[indices] = points
+        return self.refresh()
+
+    def face(self, camera):
+        # the camera maps world points p to rot @ p, so its rows 0 and 1 are screen right and up
+        rotation = camera.get_rotation_matrix()
+        if self._facing is not None and np.allclose(rotation, self._facing):
+            return self
+        self._facing = rotation.copy()
+        self.right, self.up = rotation[0], rotation[1]
+        return self.refresh()
+
+    def face_camera(self, camera):
+        self.face(camera)
+        self.add_updater(lambda m: m.face(camera))
+        return self
+
+    def refresh(self):
+        points = disc_points(self.centers, self.radius, self.right, self.up, self.sides)
+        styles = list(zip(self.colors, np.round(self.opacities, 3)))
+        keys = sorted(set(styles))
+        lookup = {key: k for k, key in enumerate(keys)}
+        style_of = np.fromiter((lookup[s] for s in styles), dtype=int, count=len(styles))
+        # one VMobject per style, reused while the set of styles stays the same
+        if [(m.point_color, m.point_opacity) for m in self.submobjects] != keys:
+            submobjects = []
+            for c, o in keys:
+                m = VMobject(fill_color=c, fill_opacity=o, stroke_width=0)
+                m.point_color, m.point_opacity = c, o
+                submobjects.append(m)
+            self.submobjects = submobjects
+        style_of = np.repeat(style_of, self.sides)
+        for k, m in enumerate(self.submobjects):
+            m.set_points(points[style_of == k].reshape(-1, 3))
+        return self
@@ -0,0 +1,141 @@
+# opt-in per play()/wait() profiler for the scenes
+#
+#   MANIM_PROFILE=1 manim -qh fastloop.py FastLoop
+#
+# every play/wait records its call site, wall time, frames written (and how
+# many of them were actually rasterized), mobject/point counts on screen and
+# the peak RSS so far. At the end of the render a JSON report is written to
+# media/profiles/<scene>.json (or to MANIM_PROFILE if it names a .json file)
+# and a section -> call site breakdown is logged, widest bars first
+from manim import *
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from tex_batch import is_collecting
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes everywhere else
+    return rss / 1024**2 if sys.platform == "darwin" else rss / 1024
+
+
+def describe(args):
+    return ", ".join(str(arg) for arg in args)[:80]
+
+
+def flame_summary(scene_name, records, width=30):
+    total = sum(r["wall_time"] for r in records) or 1e-9
+    sections = {}
+    for r in records:
+        section = sections.setdefault(r["section"], {})
+        site = section.setdefault(r["call_site"], {"wall_time": 0.0, "frames": 0, "calls": 0, "what": r["what"]})
+        site["wall_time"] += r["wall_time"]
+        site["frames"] += r["frames"]
+        site["calls"] += 1
+
+    lines = [f"{scene_name}: {total:.2f}s in {len(records)} play/wait calls"]
+    by_time = lambda item: -sum(s["wall_time"] for s in item[1].values())
+    for section, sites in sorted(sections.items(), key=by_time):
+        section_time = sum(s["wall_time"] for s in sites.values())
+        lines.append(f"{section_time / total:6.1%} {section_time:7.2f}s {'#' * round(width * section_time / total):<{width}} [{section}]")
+        for call_site, s in sorted(sites.items(), key=lambda item: -item[1]["wall_time"]):
+            bar = "=" * round(width * s["wall_time"] / total)
+            lines.append(
+                f"{s['wall_time'] / total:6.1%} {s['wall_time']:7.2f}s {bar:<{width}}   "
+                f"{call_site} x{s['calls']} {s['frames']}f  {s['what']}"
+            )
+    return "\n".join(lines)
+
+
+class Profiled:
+    # mixin, put it first: class FastLoop(Profiled, BatchedTex, Scene)
+    def setup(self):
+        self.profile_target = os.environ.get("MANIM_PROFILE")
+        self.profile_records = []
+        self._profile_depth = 0
+        if not self.profile_target or is_collecting():
+            self.profile_target = None
+            super().setup()
+            return
+
+        self._frames = [0, 0]
+        add_frame = self.renderer.add_frame
+
+        def counting_add_frame(frame, num_frames=1):
+            self._frames[0] += num_frames
+            self._frames[1] += 1
+            add_frame(frame, num_frames)
+
+        self.renderer.add_frame = counting_add_frame
+        self._profiled("setup", "setup", lambda: super(Profiled, self).setup(), [])
+
+    def _profiled(self, kind, call_site, call, args):
+        # wait() goes through play(), only the outermost call is recorded
+        if self.profile_target is None or self._profile_depth:
+            return call()
+        self._profile_depth += 1
+        frames_before = list(self._frames)
+        start = time.perf_counter()
+        try:
+            return call()
+        finally:
+            wall_time = time.perf_counter() - start
+            self._profile_depth -= 1
+            family = self.get_mobject_family_members()
+            self.profile_records.append({
+                "index": len(self.profile_records),
+                "kind": kind,
+                "call_site": call_site,
+                "what": describe(args),
+                "section": self.renderer.file_writer.sections[-1].name,
+                "wall_time": wall_time,
+                "frames": self._frames[0] - frames_before[0],
+                "rendered_frames": self._frames[1] - frames_before[1],
+                "mobjects": len(family),
+                "points": int(sum(len(m.points) for m in family)),
+                "peak_rss_mb": peak_rss_mb(),
+            })
+
+    def _call_site(self):
+        caller = sys._getframe(2)
+        return f"{Path(caller.f_code.co_filename).name}:{caller.f_lineno}"
+
+    def play(self, *args, **kwargs):
+        return self._profiled("play", self._call_site(), lambda: super(Profiled, self).play(*args, **kwargs), args)
+
+    def wait(self, *args, **kwargs):
+        return self._profiled("wait", self._call_site(), lambda: super(Profiled, self).wait(*args, **kwargs), args)
+
+    def tear_down(self):
+        super().tear_down()
+        if self.profile_target is None:
+            return
+        name = config.output_file or type(self).__name__
+        if self.profile_target.endswith(".json"):
+            path = Path(self.profile_target)
+        else:
+            path = Path(config.media_dir) / "profiles" / f"{Path(name).stem}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        report = {
+            "scene": type(self).__name__,
+            "pixel_width": config.pixel_width,
+            "pixel_height": config.pixel_height,
+            "frame_rate": config.frame_rate,
+            "total_wall_time": sum(r["wall_time"] for r in self.profile_records),
+            "peak_rss_mb": peak_rss_mb(),
+            "calls": self.profile_records,
+        }
+        path.write_text(json.dumps(report, indent=2))
+        logger.info(flame_summary(type(self).__name__, self.profile_records))
+        logger.info(f"profile written to {path}")
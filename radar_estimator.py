@@ -0,0 +1,102 @@
+# streaming estimate of where (on which channels) radar shows up
+#
+# radar detection events are fed one at a time or in chunks. The estimator
+# only keeps a fixed set of channel bins plus three running moments, so
+# memory does not grow with the history and an update costs O(events in the
+# chunk), never a re-binning of the past. With half_life set, older events
+# fade out exponentially (applied to the bins and moments as time advances).
+#
+# the histogram slides use counts/density straight from the bins, the curve
+# slides use pdf(), a gaussian fitted from the running moments, and
+# probability() is the kernel smoothed histogram evaluated at any channel
+import numpy as np
+
+
+class RadarEstimator:
+    def __init__(self, lo, hi, bins=30, half_life=None):
+        self.edges = np.linspace(lo, hi, bins + 1)
+        self.bin_width = self.edges[1] - self.edges[0]
+        self.centers = (self.edges[:-1] + self.edges[1:]) / 2.0
+        self.counts = np.zeros(bins)
+        self.half_life = half_life
+        # moments are taken around the middle of the range to keep var stable
+        self._shift = (lo + hi) / 2.0
+        self._moments = np.zeros(3)  # sum w, sum w x, sum w x^2
+        self.dropped = 0.0  # weight of events outside [lo, hi)
+
+    def decay(self, dt):
+        if self.half_life is None or dt <= 0:
+            return
+        factor = 0.5 ** (dt / self.half_life)
+        self.counts *= factor
+        self._moments *= factor
+        self.dropped *= factor
+
+    def update(self, channels, dt=0.0):
+        # dt is the time elapsed since the previous update, used for the decay
+        self.decay(dt)
+        x = np.atleast_1d(np.asarray(channels, dtype=float))
+        idx = np.floor((x - self.edges[0]) / self.bin_width).astype(int)
+        inside = (idx >= 0) & (idx < len(self.counts))
+        self.counts += np.bincount(idx[inside], minlength=len(self.counts))
+        self.dropped += np.count_nonzero(~inside)
+        d = x - self._shift
+        self._moments += (len(d), d.sum(), (d * d).sum())
+        return self
+
+    @property
+    def total(self):
+        return self._moments[0]
+
+    @property
+    def mean(self):
+        # nan until there is an event
+        if self._moments[0] <= 0:
+            return np.nan
+        return self._shift + self._moments[1] / self._moments[0]
+
+    @property
+    def std(self):
+        if self._moments[0] <= 0:
+            return np.nan
+        m = self._moments[1] / self._moments[0]
+        return np.sqrt(max(self._moments[2] / self._moments[0] - m * m, 0.0))
+
+    def density(self):
+        # normalised like np.histogram(..., density=True) over the binned events
+        binned = self.counts.sum()
+        if binned == 0:
+            return np.zeros_like(self.counts)
+        return self.counts / (binned * self.bin_width)
+
+    def pdf(self, x):
+        # fitted gaussian, works on scalars and whole arrays; flat zero before
+        # any event, and events all on one channel are as wide as a bin
+        if self._moments[0] <= 0:
+            return np.zeros(np.shape(x))
+        mu, sigma = self.mean, max(self.std, self.bin_width / 2)
+        return np.exp(-0.5 * ((np.asarray(x) - mu) / sigma) ** 2) / (sigma * np.sqrt(2 * np.pi))
+
+    def smoothed(self, bandwidth=1.0):
+        # density convolved with a gaussian kernel, bandwidth in bins
+        radius = min(max(int(np.ceil(3 * bandwidth)), 1), (len(self.counts) - 1) // 2)
+        k = np.exp(-0.5 * (np.arange(-radius, radius + 1) / bandwidth) ** 2)
+        k /= k.sum()
+        return np.convolve(self.density(), k, mode="same")
+
+    def probability(self, channels, bandwidth=1.0):
+        return np.interp(channels, self.centers, self.smoothed(bandwidth), left=0.0, right=0.0)
+
+
+if __name__ == "__main__":
+    import time
+
+    est = RadarEstimator(46, 58, bins=30, half_life=30 * 24 * 3600)
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    # a few months of events, one hourly chunk at a time
+    for hour in range(24 * 90):
+        est.update(rng.normal(52.0, 1.5, rng.poisson(50)), dt=3600)
+    elapsed = time.perf_counter() - start
+    print(f"{est.total:.0f} effective events, mean {est.mean:.2f} std {est.std:.2f}, {elapsed * 1000:.1f} ms")
+    print("P(radar) on 48..60:", np.round(est.probability([48, 52, 56, 60]), 3))
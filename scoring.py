@@ -0,0 +1,91 @@
+# channel scoring behind the formula shown in the scenes
+#
+#   S(c) = w_1 S_intf(c) + w_2 S_airtime(c) + w_3 S_BW(c) + w_4 S_DFS(c)
+#
+# every term is a "goodness" in [0, 1], so a higher score is a better fallback:
+#   S_intf = 1 - interference, S_airtime = 1 - airtime, S_BW = bandwidth score,
+#   S_DFS = 1 - P(radar)
+# the metrics are arrays of shape (..., n_channels), typically (n_aps, n_channels),
+# and everything is plain numpy broadcasting, so a 10k AP x 25 channel matrix
+# scores in a couple of milliseconds (python scoring.py to check)
+import numpy as np
+
+# (w_1 intf, w_2 airtime, w_3 BW, w_4 DFS), as in the adaptive weight tables
+WEIGHT_PROFILES = {
+    "High Load": np.array([0.25, 0.25, 0.45, 0.15]),
+    "Medium Load": np.array([0.35, 0.25, 0.15, 0.25]),
+    "Low Load": np.array([0.25, 0.25, 0.45, 0.15]),
+    "No Load": np.array([0.45, 0.375, 0.15, 0.125]),
+}
+
+
+def score(interference, airtime, bandwidth, dfs_prob, weights):
+    # weights is one profile (4,) or one profile per AP (n_aps, 4)
+    w = np.asarray(weights, dtype=float)
+    if w.ndim > 1:
+        w = w[..., None, :]
+    w_intf, w_air, w_bw, w_dfs = (w[..., i] for i in range(4))
+    # w1 (1 - I) + w2 (1 - A) + w3 B + w4 (1 - D), with the constant folded out;
+    # s is a real array of the full broadcast shape, so scalar metrics work too
+    s = np.empty(np.broadcast_shapes(*map(np.shape, (w_intf, interference, airtime, bandwidth, dfs_prob))))
+    np.multiply(w_intf, interference, out=s)
+    s += np.multiply(w_air, airtime)
+    s += np.multiply(w_dfs, dfs_prob)
+    s -= np.multiply(w_bw, bandwidth)
+    np.subtract(w_intf + w_air + w_dfs, s, out=s)
+    return s[()]
+
+
+def rank(scores, exclude=None, top=None):
+    # channel indices from best to worst along the last axis; excluded channels
+    # (the one radar was just detected on, say) are dropped to the end
+    scores = np.asarray(scores, dtype=float)
+    if exclude is not None:
+        scores = np.where(exclude, -np.inf, scores)
+    if top is not None and top < scores.shape[-1]:
+        best = np.argpartition(-scores, top - 1, axis=-1)[..., :top]
+        order = np.argsort(-np.take_along_axis(scores, best, axis=-1), axis=-1, kind="stable")
+        return np.take_along_axis(best, order, axis=-1)
+    return np.argsort(-scores, axis=-1, kind="stable")
+
+
+def fallback_channels(channels, scores, exclude=None, top=None):
+    # the ranked fallback list as channel numbers
+    return np.asarray(channels)[rank(scores, exclude, top)]
+
+
+def interference_label(value):
+    if value < 0.1:
+        return "V. Low"
+    if value < 0.3:
+        return "Low"
+    if value < 0.5:
+        return "Med"
+    return "High"
+
+
+def ranking_rows(channels, interference, airtime, bandwidth, dfs_prob, weights):
+    # header + one row per channel for the "Step 3" tables, in the given order
+    scores = score(interference, airtime, bandwidth, dfs_prob, weights)
+    rows = [["CH", "Intf", "DFS P", "Airtime", "Score"]]
+    for ch, intf, air, dfs, s in zip(channels, interference, airtime, dfs_prob, scores):
+        rows.append([str(ch), interference_label(intf), f"{dfs:.1f}", f"{air:.0%}", f"{s:.2f}"])
+    return rows, scores
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n_aps, n_channels = 10_000, 25
+    metrics = rng.random((4, n_aps, n_channels))
+    weights = np.stack(list(WEIGHT_PROFILES.values()))[rng.integers(0, 4, n_aps)]
+    current = rng.integers(0, n_channels, n_aps)
+    exclude = np.arange(n_channels) == current[:, None]
+
+    for _ in range(3):
+        start = time.perf_counter()
+        s = score(*metrics, weights)
+        order = rank(s, exclude, top=5)
+        elapsed = time.perf_counter() - start
+    print(f"scored and ranked {n_aps} APs x {n_channels} channels in {elapsed * 1000:.2f} ms")
@@ -1,6 +1,10 @@
 from manim import *
 
-class SecondPassScene(Scene):
+from association import Association
+from connections import ConnectionSet, DrawConnections, FadeConnections
+from profiling import Profiled
+
+class SecondPassScene(Profiled, Scene):
     def construct(self):
         # make a lattice of 9 APs in a 3x3 grid
         self.time_scale = 2.0
@@ -31,20 +35,18 @@ class SecondPassScene(Scene):
             LEFT + ORIGIN + [0.4, 0, 0],
         ]
 
-        sta_lines = []
-
-        for sta_pos in sta_positions:
-            sta = Dot(sta_pos, color=GREEN)
-            closest_ap = min(aps, key=lambda ap: np.linalg.norm(ap.get_center() - sta.get_center()))
-            line = DashedLine(closest_ap.get_center(), sta.get_center(), dash_length=0.1, color=YELLOW)
-            sta_lines.append((sta, line))
-            self.add(sta)
-            self.add(line)
-
-        sta_line_1_new = DashedLine(aps[1].get_center(), sta_positions[1], dash_length=0.1, color=RED)
+        association = Association(ap_positions)
+        nearest = association.assign(sta_positions)
+        # second pass: the central AP is overloaded, move STAs to their next nearest AP
+        balanced = association.balance(sta_positions)
 
-        self.play(FadeOut(sta_lines[1][1]), Write(sta_line_1_new), run_time=run_time)
+        ap_centers = np.array([ap.get_center() for ap in aps])
+        changed = np.flatnonzero(balanced != nearest)
+        lines = ConnectionSet(ap_centers[nearest], sta_positions, dash_length=0.1, color=YELLOW)
+        new_lines = ConnectionSet(ap_centers[balanced[changed]], np.array(sta_positions)[changed], dash_length=0.1, color=RED, progress=0)
 
-        sta_line_2_new = DashedLine(aps[7].get_center(), sta_positions[2], dash_length=0.1, color=RED)
+        self.add(*[Dot(sta_pos, color=GREEN) for sta_pos in sta_positions])
+        self.add(lines)
 
-        self.play(FadeOut(sta_lines[2][1]), Write(sta_line_2_new), run_time=run_time)
+        for j, i in enumerate(changed):
+            self.play(FadeConnections(lines, [i]), DrawConnections(new_lines, [j]), run_time=run_time)
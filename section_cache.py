@@ -0,0 +1,57 @@
+# content-addressed store for rendered section movies
+#
+# a section's key is a hash of every play()/wait() in it (manim's own
+# get_hash_from_play_call, which covers the animations, the mobjects on screen
+# when the play starts and the camera) plus the render config, so a section is
+# only rendered again when something it shows actually changed.
+# entries are touched on every hit and the least recently used ones are
+# deleted once the cache grows past max_bytes
+import os
+import shutil
+from pathlib import Path
+
+
+class SectionCache:
+    def __init__(self, directory, max_bytes=2 * 1024**3, extension=".mp4"):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.extension = extension
+
+    def path(self, key):
+        return self.directory / f"{key}{self.extension}"
+
+    def get(self, key):
+        path = self.path(key)
+        if not path.exists():
+            return None
+        # mtime doubles as the LRU timestamp (atime is often disabled)
+        os.utime(path)
+        return path
+
+    def put(self, key, movie):
+        path = self.path(key)
+        # write next to the final name first so a crash never leaves half a movie under a valid key
+        tmp = path.with_suffix(".partial")
+        shutil.move(str(movie), tmp)
+        os.replace(tmp, path)
+        return path
+
+    def size(self):
+        return sum(p.stat().st_size for p in self.directory.glob(f"*{self.extension}"))
+
+    def evict(self, keep=()):
+        keep = {self.path(key) for key in keep}
+        entries = sorted(
+            (p.stat().st_mtime, p.stat().st_size, p)
+            for p in self.directory.glob(f"*{self.extension}")
+        )
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path in keep:
+                continue
+            path.unlink()
+            total -= size
+        return total
@@ -0,0 +1,196 @@
+# render the sections of a scene in parallel and stitch them back into one movie
+#
+#   python section_render.py detailed.py DetailedFastLoop -q h -j 5
+#   python section_render.py vector.py DetailedFastLoop_Reordered -q h
+#
+# every worker runs the whole construct(), but only writes frames for its own
+# section: the sections before it are played with skip_animations (so the
+# mobjects end up in the right state without rendering anything) and the scene
+# is stopped as soon as the next section starts
+#
+# finished sections are kept in a SectionCache, so after an edit only the
+# sections whose content changed are rendered again (--no-cache to disable)
+from manim import *
+from manim.utils.exceptions import EndSceneEarlyException
+from manim.utils.hashing import get_hash_from_play_call
+import argparse
+import hashlib
+import importlib.util
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import av
+
+from section_cache import SectionCache
+
+QUALITY_FLAGS = {q["flag"]: name for name, q in QUALITIES.items() if q["flag"]}
+
+
+def load_scene_class(script, scene_name):
+    spec = importlib.util.spec_from_file_location(Path(script).stem, script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, scene_name)
+
+
+def section_scene_class(scene_cls, target, hash_plays=False):
+    # target is the index of the section to render, None skips every section
+    class SectionScene(scene_cls):
+        def setup(self):
+            super().setup()
+            self.section_names = []
+            self.section_play_hashes = [[]]
+            # anything played before the first next_section belongs to section 0
+            self.renderer.file_writer.sections[-1].skip_animations = target != 0
+
+        def next_section(self, name="unnamed", section_type=DefaultSectionType.NORMAL, skip_animations=False):
+            index = len(self.section_names)
+            if target is not None and index > target:
+                raise EndSceneEarlyException()
+            if index > 0:
+                self.section_play_hashes.append([])
+            self.section_names.append(name)
+            super().next_section(name, section_type, skip_animations or index != target)
+
+        def begin_animations(self):
+            # skipped plays are never hashed by the renderer, so do it here
+            if hash_plays:
+                self.section_play_hashes[-1].append(
+                    get_hash_from_play_call(self, self.renderer.camera, self.animations, self.mobjects)
+                )
+            super().begin_animations()
+
+    # keep the original name so the output lands next to the serial render
+    SectionScene.__name__ = SectionScene.__qualname__ = scene_cls.__name__
+    return SectionScene
+
+
+def render_config(script, quality):
+    q = QUALITIES[quality]
+    return {
+        "input_file": str(script),
+        "pixel_width": q["pixel_width"],
+        "pixel_height": q["pixel_height"],
+        "frame_rate": q["frame_rate"],
+    }
+
+
+def section_keys(play_hashes, overrides):
+    # anything that changes the pixels without changing the plays goes in here
+    render_key = repr((__version__, sorted(overrides.items()), config.movie_file_extension))
+    keys = []
+    for hashes in play_hashes:
+        h = hashlib.sha256(render_key.encode())
+        for play_hash in hashes:
+            h.update(play_hash.encode())
+        keys.append(h.hexdigest())
+    return keys
+
+
+def probe_sections(script, scene_name, overrides, seed):
+    # fast-forward the whole scene without writing anything, which also fills
+    # the Tex/Text caches so the workers only ever read from them
+    scene_cls = section_scene_class(load_scene_class(script, scene_name), None, hash_plays=True)
+    with tempconfig({**overrides, "dry_run": True}):
+        scene = scene_cls(random_seed=seed)
+        scene.render()
+    # input_file only decides where the output goes, not what it looks like
+    render = {k: v for k, v in overrides.items() if k != "input_file"}
+    return scene.section_names, section_keys(scene.section_play_hashes, render)
+
+
+def render_section(script, scene_name, overrides, seed, index):
+    scene_cls = section_scene_class(load_scene_class(script, scene_name), index)
+    section_config = {
+        **overrides,
+        "output_file": f"{scene_name}_section{index:02}",
+        # workers must not share the partial movie list file
+        "partial_movie_dir": f"{{video_dir}}/partial_movie_files/{{scene_name}}/section{index:02}",
+    }
+    with tempconfig(section_config):
+        scene = scene_cls(random_seed=seed)
+        scene.render()
+        path = scene.renderer.file_writer.movie_file_path
+        # a section without any play()/wait() produces no movie
+        return str(path) if path.exists() else None
+
+
+def concat_movies(paths, output):
+    # same concat demuxer trick SceneFileWriter.combine_files uses, without re-encoding
+    file_list = Path(output).with_suffix(".txt")
+    with file_list.open("w", encoding="utf-8") as fp:
+        for path in paths:
+            fp.write(f"file 'file:{Path(path).as_posix()}'\n")
+
+    movies = av.open(str(file_list), options={"safe": "0", "an": "1"}, format="concat")
+    stream = movies.streams.video[0]
+    out = av.open(str(output), mode="w")
+    out_stream = out.add_stream(template=stream)
+    for packet in movies.demux(stream):
+        if packet.dts is None:
+            continue
+        packet.dts = None
+        packet.stream = out_stream
+        out.mux(packet)
+    movies.close()
+    out.close()
+    file_list.unlink()
+
+
+def render_parallel(script, scene_name, quality="high_quality", jobs=None, seed=0, cache_bytes=2 * 1024**3):
+    overrides = render_config(script, quality)
+    names, keys = probe_sections(script, scene_name, overrides, seed)
+    logger.info(f"{scene_name}: {len(names)} sections {names}")
+
+    cache = None
+    parts = [None] * len(names)
+    if cache_bytes:
+        cache = SectionCache(Path(config.media_dir) / "section_cache", cache_bytes, config.movie_file_extension)
+        parts = [cache.get(key) for key in keys]
+        for name, part in zip(names, parts):
+            if part is not None:
+                logger.info(f"{scene_name}: section '{name}' unchanged, using cached movie")
+
+    todo = [i for i, part in enumerate(parts) if part is None]
+    if todo:
+        jobs = min(jobs or os.cpu_count(), len(todo))
+        # spawn so that every worker starts from a clean global manim config
+        with ProcessPoolExecutor(jobs, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {
+                i: pool.submit(render_section, script, scene_name, overrides, seed, i)
+                for i in todo
+            }
+            for i, future in futures.items():
+                parts[i] = future.result()
+                if cache is not None and parts[i] is not None:
+                    parts[i] = cache.put(keys[i], parts[i])
+
+    parts = [p for p in parts if p is not None]
+    with tempconfig(overrides):
+        output = config.get_dir("video_dir", module_name=Path(script).stem) / f"{scene_name}{config.movie_file_extension}"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    concat_movies(parts, output)
+    if cache is None:
+        for part in parts:
+            Path(part).unlink()
+    else:
+        cache.evict(keep=keys)
+    logger.info(f"{scene_name}: stitched {len(parts)} sections ({len(todo)} rendered) into {output}")
+    return output
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the sections of a scene on a process pool")
+    parser.add_argument("script")
+    parser.add_argument("scene")
+    parser.add_argument("-q", "--quality", default="h", choices=sorted(QUALITY_FLAGS))
+    parser.add_argument("-j", "--jobs", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache-size", type=int, default=2048, help="section cache size in MB")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+
+    cache_bytes = 0 if args.no_cache else args.cache_size * 1024**2
+    render_parallel(args.script, args.scene, QUALITY_FLAGS[args.quality], args.jobs, args.seed, cache_bytes)
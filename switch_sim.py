@@ -0,0 +1,105 @@
+# discrete-event simulation of the fast loop channel switch
+#
+# one scenario is one AP leaving a channel after radar:
+#   radar -> detect (confirm the pulses) -> score the candidates -> select
+#   -> CSA (announced in the next beacon, csa_count beacons before the move)
+#   -> switch (radio retune) -> every STA reassociates
+# and its latency is the time until the last STA is back. STAs that miss the
+# CSA only notice after beacon_loss lost beacons and then rescan.
+#
+# all scenarios share one heap of (time, seq, scenario, stage, sta) events,
+# so thousands run per second; run() returns the latency of every scenario
+# and the time each stage finished (python switch_sim.py for p50/p99)
+import heapq
+import random
+
+import numpy as np
+
+STAGES = ("radar", "detect", "score", "select", "csa", "switch", "reassoc")
+
+
+class SwitchSimulator:
+    def __init__(
+        self, n_stas=5, n_candidates=5, beacon_interval=102.4, csa_count=1, miss_prob=0.05,
+        detect_ms=(2.0, 10.0), score_ms_per_candidate=0.05, retune_ms=5.0, reassoc_ms=15.0,
+        beacon_loss=3, rescan_ms=(50.0, 150.0), seed=0,
+    ):
+        self.n_stas = n_stas
+        self.n_candidates = n_candidates
+        self.beacon_interval = beacon_interval
+        self.csa_count = csa_count
+        self.miss_prob = miss_prob
+        self.detect_ms = detect_ms
+        self.score_ms_per_candidate = score_ms_per_candidate
+        self.retune_ms = retune_ms
+        self.reassoc_ms = reassoc_ms
+        self.beacon_loss = beacon_loss
+        self.rescan_ms = rescan_ms
+        self.rng = random.Random(seed)
+
+    def run(self, n_scenarios):
+        rng = self.rng
+        queue = []
+        seq = 0
+        stage_done = np.zeros((n_scenarios, len(STAGES)))
+        pending = np.full(n_scenarios, self.n_stas)
+
+        def schedule(t, scenario, stage, sta=-1):
+            # stage is an index into STAGES
+            nonlocal seq
+            heapq.heappush(queue, (t, seq, scenario, stage, sta))
+            seq += 1
+
+        for s in range(n_scenarios):
+            # radar hits at a random phase of the beacon schedule
+            schedule(rng.uniform(0, self.beacon_interval), s, 0)
+        while queue:
+            t, _, s, stage, sta = heapq.heappop(queue)
+            if stage == 6:
+                pending[s] -= 1
+                if pending[s] == 0:
+                    stage_done[s, 6] = t
+                continue
+            stage_done[s, stage] = t
+            if stage == 0:
+                schedule(t + rng.uniform(*self.detect_ms), s, 1)
+            elif stage == 1:
+                scoring = self.n_candidates * self.score_ms_per_candidate * rng.lognormvariate(0, 0.3)
+                schedule(t + scoring, s, 2)
+            elif stage == 2:
+                schedule(t + 0.1, s, 3)
+            elif stage == 3:
+                # CSA goes out in the next beacon (after medium access), the move csa_count beacons later
+                next_beacon = self.beacon_interval - t % self.beacon_interval
+                access = rng.expovariate(1.0)
+                schedule(t + next_beacon + access, s, 4)
+            elif stage == 4:
+                schedule(t + (self.csa_count - 1) * self.beacon_interval + self.retune_ms, s, 5)
+            elif stage == 5:
+                for k in range(self.n_stas):
+                    if rng.random() < self.miss_prob:
+                        delay = self.beacon_loss * self.beacon_interval + rng.uniform(*self.rescan_ms)
+                    else:
+                        delay = rng.lognormvariate(np.log(self.reassoc_ms), 0.5)
+                    schedule(t + delay, s, 6, k)
+        # latencies from the radar hit
+        stage_done -= stage_done[:, :1]
+        return stage_done[:, -1], stage_done
+
+
+def percentiles(latencies, q=(50, 99)):
+    return dict(zip(q, np.percentile(latencies, q)))
+
+
+if __name__ == "__main__":
+    import time
+
+    sim = SwitchSimulator()
+    start = time.perf_counter()
+    latencies, stages = sim.run(10_000)
+    elapsed = time.perf_counter() - start
+    p = percentiles(latencies, (50, 90, 99))
+    print(f"10000 switches in {elapsed:.2f} s ({10_000 / elapsed:.0f}/s)")
+    print("latency ms: " + ", ".join(f"p{q} {v:.1f}" for q, v in p.items()))
+    print("mean stage finish ms: " + ", ".join(f"{name} {v:.1f}" for name, v in zip(STAGES, stages.mean(axis=0))))
+    print(f"P(latency < 200 ms) = {(latencies < 200).mean():.3f}")
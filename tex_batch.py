@@ -0,0 +1,208 @@
+# compile every MathTex/Tex a scene uses in a single LaTeX run
+#
+# manim starts latex + dvisvgm once per expression, which dominates the
+# render time of tex heavy scenes like FastLoop (channel labels, the S(c)
+# formula and every cell of the weight tables). Scenes that inherit from
+# BatchedTex first run their construct() in a dry run where tex_to_svg_file
+# only records what would be compiled, then put all the missing expressions
+# on the pages of one standalone document, compile it once and split the
+# pages into the per-expression svg files manim looks for in media/Tex.
+# The real render then finds every svg already cached.
+#
+# the svgs a scene needed are listed in a manifest keyed by the source of
+# every (non manim) class the scene is built from, so a render whose scene
+# did not change and whose svgs are all cached skips the dry run altogether
+from manim import *
+from manim.mobject.text import tex_mobject
+from manim.utils.tex_file_writing import compile_tex, delete_nonsvg_files, tex_hash
+from contextlib import contextmanager
+from pathlib import Path
+import hashlib
+import json
+import numpy as np
+import random
+import re
+import subprocess
+
+BATCH_ENV = "manimbatch"
+PLACEHOLDER_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10" viewBox="0 0 10 10">'
+    '<path d="M0 0H10V10H0Z"/></svg>'
+)
+
+_collecting = False
+
+
+def is_collecting():
+    # True while a BatchedTex dry run is building mobjects from placeholder svgs
+    return _collecting
+
+
+@contextmanager
+def record_tex():
+    # every call to tex_to_svg_file is recorded and answered with a dummy svg,
+    # so the dry run never starts latex
+    global _collecting
+    recorded = []
+    placeholder = config.get_dir("tex_dir") / "batch_placeholder.svg"
+    placeholder.parent.mkdir(parents=True, exist_ok=True)
+    placeholder.write_text(PLACEHOLDER_SVG)
+
+    def recorder(expression, environment=None, tex_template=None):
+        recorded.append((expression, environment, tex_template or config["tex_template"]))
+        return placeholder
+
+    original = tex_mobject.tex_to_svg_file
+    tex_mobject.tex_to_svg_file = recorder
+    _collecting = True
+    try:
+        yield recorded
+    finally:
+        tex_mobject.tex_to_svg_file = original
+        _collecting = False
+
+
+def scene_source_key(scene_cls):
+    # hash of the files defining the scene's classes (section_render loads
+    # scripts outside sys.modules, so they are found through the functions)
+    files = set()
+    for cls in scene_cls.__mro__:
+        if cls.__module__.split(".")[0] in ("manim", "builtins"):
+            continue
+        for attr in vars(cls).values():
+            code = getattr(attr, "__code__", None)
+            if code is not None:
+                files.add(code.co_filename)
+    digest = hashlib.sha256((scene_cls.__name__ + config["tex_template"].body).encode())
+    for file in sorted(files):
+        try:
+            digest.update(Path(file).read_bytes())
+        except OSError:
+            digest.update(file.encode())
+    return digest.hexdigest()[:16]
+
+
+def collect_tex(scene_cls):
+    # the dry run must not eat into the random numbers of the real render
+    states = random.getstate(), np.random.get_state()
+    dry = {"dry_run": True, "preview": False, "show_in_file_browser": False}
+    complete = True
+    with tempconfig(dry), record_tex() as recorded:
+        try:
+            scene_cls(skip_animations=True).render()
+        except Exception as e:
+            # the placeholder geometry can upset scene code that indexes into
+            # tex submobjects; whatever was recorded up to here still gets batched
+            logger.warning(f"tex collection for {scene_cls.__name__} stopped early: {e!r}")
+            complete = False
+    random.setstate(states[0])
+    np.random.set_state(states[1])
+    return recorded, complete
+
+
+def texcode(expression, environment, tex_template):
+    if environment is not None:
+        return tex_template.get_texcode_for_expression_in_env(expression, environment)
+    return tex_template.get_texcode_for_expression(expression)
+
+
+def batch_document(tex_template, pages):
+    # one cropped page per expression: standalone's multi mode turns every
+    # BATCH_ENV environment into its own preview page
+    prefix, suffix = tex_template.body.split(tex_template.placeholder_text)
+    prefix, n = re.subn(
+        r"\\documentclass\[([^\]]*)\]\{standalone\}",
+        lambda m: rf"\documentclass[{m[1]},multi={BATCH_ENV}]{{standalone}}",
+        prefix,
+        count=1,
+    )
+    if n == 0:
+        return None
+    body = "\n".join(rf"\begin{{{BATCH_ENV}}}{page}\end{{{BATCH_ENV}}}" for page in pages)
+    return prefix + body + suffix
+
+
+def compile_batch(tex_template, entries):
+    # entries are (full single expression tex code, svg path manim expects)
+    prefix, suffix = tex_template.body.split(tex_template.placeholder_text)
+    pages = [code[len(prefix):len(code) - len(suffix)] for code, _ in entries]
+    document = batch_document(tex_template, pages)
+    if document is None:
+        logger.info("tex template is not a standalone document, not batching it")
+        return 0
+
+    tex_dir = config.get_dir("tex_dir")
+    tex_file = tex_dir / f"batch_{tex_hash(document)}.tex"
+    tex_file.write_text(document, encoding="utf-8")
+    try:
+        dvi_file = compile_tex(tex_file, tex_template.tex_compiler, tex_template.output_format)
+    except ValueError:
+        # let manim compile them one by one and report the broken expression
+        logger.warning("batched tex compilation failed, falling back to per-expression runs")
+        tex_file.unlink()
+        return 0
+
+    subprocess.run(
+        [
+            "dvisvgm",
+            *(["--pdf"] if tex_template.output_format == ".pdf" else []),
+            "--page=1-",
+            "--no-fonts",
+            "--verbosity=0",
+            f"--output={tex_file.with_suffix('').as_posix()}-%p.svg",
+            dvi_file.as_posix(),
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+    svgs = sorted(tex_dir.glob(f"{tex_file.stem}-*.svg"), key=lambda p: int(p.stem.rsplit("-", 1)[1]))
+    if len(svgs) == len(entries):
+        for svg, (_, target) in zip(svgs, entries):
+            svg.replace(target)
+    else:
+        logger.warning(f"batched tex produced {len(svgs)} pages for {len(entries)} expressions, ignoring it")
+        for svg in svgs:
+            svg.unlink()
+
+    tex_file.unlink()
+    if not config["no_latex_cleanup"]:
+        delete_nonsvg_files()
+    return len(entries) if len(svgs) == len(entries) else 0
+
+
+def precompile_tex(scene_cls):
+    tex_dir = config.get_dir("tex_dir")
+    manifest = tex_dir / f"batch_{scene_cls.__name__}_{scene_source_key(scene_cls)}.json"
+    if manifest.exists() and all((tex_dir / name).exists() for name in json.loads(manifest.read_text())):
+        logger.debug(f"{scene_cls.__name__}: every tex expression is cached, no dry run")
+        return 0
+
+    batches = {}
+    recorded, complete = collect_tex(scene_cls)
+    svgs = []
+    for expression, environment, tex_template in recorded:
+        code = texcode(expression, environment, tex_template)
+        svg = tex_dir / f"{tex_hash(code)}.svg"
+        svgs.append(svg.name)
+        if svg.exists():
+            continue
+        key = (tex_template.body, tex_template.tex_compiler, tex_template.output_format)
+        template, entries = batches.setdefault(key, (tex_template, {}))
+        entries[svg] = code
+
+    compiled = 0
+    for template, entries in batches.values():
+        compiled += compile_batch(template, [(code, svg) for svg, code in entries.items()])
+    if compiled:
+        logger.info(f"{scene_cls.__name__}: compiled {compiled} tex expressions in {len(batches)} latex run(s)")
+    # a partial list would skip the dry run with expressions still missing
+    if complete:
+        manifest.write_text(json.dumps(sorted(set(svgs))))
+    return compiled
+
+
+class BatchedTex:
+    # mixin, put it before the Scene class: class FastLoop(BatchedTex, Scene)
+    def setup(self):
+        super().setup()
+        if not _collecting:
+            precompile_tex(type(self))
@@ -0,0 +1,106 @@
+# shared builders for the AP / STA / range mobjects every scene draws
+#
+# each kind of mobject is built once at the origin as a prototype, keyed on
+# the parameters that change its shape (text, radius, color, font size...),
+# and every caller gets a copy that is then moved into place. Prototypes are
+# also pickled to media/prototypes so later renders skip the geometry and the
+# Text/MathTex generation altogether.
+# manim animations edit point arrays in place, so a clone has to own its
+# arrays: copy() is a plain deepcopy of the prototype, which is a handful of
+# numpy memcpys compared to rebuilding (and re-parsing the svg of) the mobject
+from manim import *
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+from tex_batch import is_collecting
+
+_prototypes = {}
+
+
+def prototype_dir():
+    return Path(config.media_dir) / "prototypes"
+
+
+def prototype(key, build):
+    # the BatchedTex dry run renders tex as placeholders, never keep those
+    if is_collecting():
+        return build()
+    # tex and text depend on the template, so it is part of every key
+    key = repr((__version__, config["tex_template"].body, key))
+    if key not in _prototypes:
+        path = prototype_dir() / f"{hashlib.sha256(key.encode()).hexdigest()[:16]}.pkl"
+        mob = None
+        if path.exists():
+            try:
+                mob = pickle.loads(path.read_bytes())
+            except Exception as e:
+                logger.debug(f"discarding unreadable prototype {path}: {e!r}")
+        if mob is None:
+            mob = build()
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(f".{os.getpid()}.tmp")
+                tmp.write_bytes(pickle.dumps(mob))
+                tmp.replace(path)
+            except Exception as e:
+                logger.debug(f"could not store prototype {path}: {e!r}")
+        _prototypes[key] = mob
+    return _prototypes[key].copy()
+
+
+def ap_dot(pos, color=BLUE, radius=DEFAULT_DOT_RADIUS):
+    return prototype(("dot", color, radius), lambda: Dot(ORIGIN, color=color, radius=radius)).move_to(pos)
+
+
+def ap_with_antenna(pos, color=BLUE, radius=0.15, height=0.3):
+    # antenna first so that [1] is the dot, like VGroup(antenna, ap) in the scenes
+    antenna = prototype(
+        ("antenna", height), lambda: Line(ORIGIN, UP * height, color=GRAY)
+    ).shift(np.array(pos, dtype=float))
+    return VGroup(antenna, ap_dot(pos, color, radius))
+
+
+def coverage(pos, radius, color=BLUE, fill_opacity=0.1):
+    return prototype(
+        ("coverage", radius, color, fill_opacity),
+        lambda: Circle(radius=radius, color=color, fill_opacity=fill_opacity),
+    ).move_to(pos)
+
+
+def station(pos, color=GREEN, side_length=None):
+    # stations are dots, or filled squares when side_length is given
+    if side_length is None:
+        return ap_dot(pos, color)
+    return prototype(
+        ("sta", color, side_length),
+        lambda: Square(side_length=side_length, color=color, fill_opacity=1),
+    ).move_to(pos)
+
+
+def tex_label(expression, font_size=32, color=WHITE):
+    return prototype(("tex", expression, font_size, color), lambda: MathTex(expression, font_size=font_size, color=color))
+
+
+def text_label(text, font_size=24, color=WHITE):
+    return prototype(("text", text, font_size, color), lambda: Text(text, font_size=font_size, color=color))
+
+
+def channel_label(ch, color=BLUE, font_size=32):
+    return tex_label(f"CH = {ch}", font_size, color)
+
+
+def ap_topology(ap_config, range_radius=3.5, font_size=28, dot_radius=0.15, with_ranges=True):
+    # ap_config entries look like {"pos": [x, y, 0], "ch": 52, "color": BLUE};
+    # with_ranges=False skips the range circles (ranges is None), e.g. next to a CoverageMap
+    aps = VGroup()
+    ranges = VGroup() if with_ranges else None
+    labels = VGroup()
+    for conf in ap_config:
+        ap_group = ap_with_antenna(conf["pos"], conf["color"], dot_radius)
+        aps.add(ap_group)
+        if ranges is not None:
+            ranges.add(coverage(conf["pos"], range_radius, conf["color"]))
+        labels.add(channel_label(conf["ch"], conf["color"], font_size).next_to(ap_group[1], DOWN))
+    return aps, ranges, labels
@@ -1,23 +1,28 @@
 from manim import *
 import math
 
-class TriangulationAnimation(Scene):
+from multilateration import error_ellipses, solve
+from profiling import Profiled
+from tex_batch import BatchedTex
+from topology import ap_dot, station, tex_label
+
+class TriangulationAnimation(Profiled, BatchedTex, Scene):
     def construct(self):
         # make background white
         self.camera.background_color = BLACK
 
         # Points (known A, B) and unknown C
-        A = Dot([-3, -3, 0], color=BLUE)
-        B = Dot([4, -3, 0], color=BLUE)
-        C = Dot([0, 3, 0], color=BLUE)
+        A = ap_dot([-3, -3, 0])
+        B = ap_dot([4, -3, 0])
+        C = ap_dot([0, 3, 0])
         # make D show up at the top of every other line in the scene
-        D = Dot([0, -1, 0], color=RED)
+        D = station([0, -1, 0], RED)
 
         # label_A = Text("", font_size=32, color=BLUE).next_to(A, DOWN)
-        label_A = MathTex("AP_1", font_size=32, color=BLUE).next_to(A, DOWN)
-        label_B = MathTex("AP_2", font_size=32, color=BLUE).next_to(B, DOWN)
-        label_C = MathTex("AP_3", font_size=32, color=BLUE).next_to(C, UP)
-        label_D = MathTex("STA", font_size=32, color=RED).next_to(D, DOWN)
+        label_A = tex_label("AP_1", 32, BLUE).next_to(A, DOWN)
+        label_B = tex_label("AP_2", 32, BLUE).next_to(B, DOWN)
+        label_C = tex_label("AP_3", 32, BLUE).next_to(C, UP)
+        label_D = tex_label("STA", 32, RED).next_to(D, DOWN)
 
         # self.play(Create(A), Create(B), Create(C))
         # self.play(Write(label_A), Write(label_B), Write(label_C))
@@ -42,17 +47,26 @@ class TriangulationAnimation(Scene):
                   FadeOut(AD_text), FadeOut(BD_text), FadeOut(CD_text))
         self.wait()
 
-        rA = A.get_center() - D.get_center()
-        rB = B.get_center() - D.get_center()
-        rC = C.get_center() - D.get_center()
+        # noisy ranges from the three APs, the STA is solved from those alone
+        range_noise = 0.15
+        anchors = np.array([A.get_center(), B.get_center(), C.get_center()])[:, :2]
+        measured = np.linalg.norm(anchors - D.get_center()[:2], axis=1) + np.random.normal(0, range_noise, 3)
+        estimate, cov = solve(anchors, measured[None], range_noise)
+        width, height, angle = error_ellipses(cov)
 
-        arc_A = Arc(radius=math.sqrt(rA[0]**2 + rA[1]**2), start_angle=0, angle=PI, color=YELLOW).shift(A.get_center())
-        arc_B = Arc(radius=math.sqrt(rB[0]**2 + rB[1]**2), start_angle=PI/3, angle=2*PI/3, color=YELLOW).shift(B.get_center())
-        arc_C = Arc(radius=math.sqrt(rC[0]**2 + rC[1]**2), start_angle=PI, angle=PI, color=YELLOW).shift(C.get_center())
+        arc_A = Arc(radius=measured[0], start_angle=0, angle=PI, color=YELLOW).shift(A.get_center())
+        arc_B = Arc(radius=measured[1], start_angle=PI/3, angle=2*PI/3, color=YELLOW).shift(B.get_center())
+        arc_C = Arc(radius=measured[2], start_angle=PI, angle=PI, color=YELLOW).shift(C.get_center())
         self.play(Create(arc_A), Create(arc_B), Create(arc_C))
 
+        # least-squares estimate and its 95% uncertainty ellipse
+        estimate_pos = np.append(estimate[0], 0)
+        estimate_dot = Dot(estimate_pos, color=ORANGE, radius=0.06)
+        ellipse = Ellipse(width=width[0], height=height[0], color=ORANGE, fill_opacity=0.2).rotate(angle[0]).move_to(estimate_pos)
+        self.play(FadeIn(estimate_dot), Create(ellipse))
+
         self.wait(0.5)
-        label_D = MathTex("STA", font_size=32, color=RED).shift([0.9, -0.5, 0])
+        label_D = tex_label("STA", 32, RED).shift([0.9, -0.5, 0])
 
         # make D appear again
         self.play(FadeIn(D), Write(label_D), FadeIn(AD_line), FadeIn(BD_line), FadeIn(CD_line),